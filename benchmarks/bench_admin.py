@@ -0,0 +1,93 @@
+# 後台內容管理：舊的「全部 .all() 塞進一頁」vs 分頁各自載入 + keyset，以及新增表單的下拉選單 vs typeahead
+# 用法：python benchmarks/bench_admin.py [歌曲數量]   (預設 200000)
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+TMP = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(TMP, "bench_admin.db")}'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.orm import joinedload  # noqa: E402
+from app import app, db, User, Artist, Album, Song  # noqa: E402
+
+
+def fill(n_songs):
+    rng = random.Random(42)
+    n_artists = max(10, n_songs // 50)
+    n_albums = max(10, n_songs // 10)
+    n_users = max(10, n_songs // 4)
+    with app.app_context():
+        db.create_all()
+        db.session.execute(User.__table__.insert(), [{'user_id': i, 'email': f'u{i}@example.com', 'password_hash': 'x',
+                                                      'display_name': f'user {i}'} for i in range(1, n_users + 1)])
+        db.session.execute(Artist.__table__.insert(), [{'artist_id': i, 'name': f'artist {rng.random():.8f}'}
+                                                       for i in range(1, n_artists + 1)])
+        db.session.execute(Album.__table__.insert(), [{'album_id': i, 'title': f'album {rng.random():.8f}',
+                                                       'artist_id': rng.randint(1, n_artists)} for i in range(1, n_albums + 1)])
+        db.session.execute(Song.__table__.insert(), [{'song_id': i, 'title': f'song {rng.random():.8f}',
+                                                      'album_id': rng.randint(1, n_albums)} for i in range(1, n_songs + 1)])
+        db.session.commit()
+    return n_users, n_artists, n_albums
+
+
+def measure(label, fn, runs=5):
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(runs):
+        result = fn()
+    ms = (time.perf_counter() - start) / runs * 1000
+    peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+    size = f'  ({len(result.data) / 1024:.0f} KB)' if hasattr(result, 'data') else ''
+    print(f'  {label:40} {ms:9.1f} ms  最多 {peak:7.1f} MB{size}')
+    return result
+
+
+def old_manage():
+    # 舊的 admin_manage()：四張表全部載入
+    with app.app_context():
+        return (Artist.query.order_by(Artist.artist_id.desc()).all(), Album.query.order_by(Album.album_id.desc()).all(),
+                Song.query.order_by(Song.song_id.desc()).all(), User.query.order_by(User.user_id.desc()).all())
+
+
+def old_dropdowns():
+    # 舊的 admin_dashboard()：演出者、專輯全部載入給下拉選單
+    with app.app_context():
+        return Artist.query.all(), Album.query.options(joinedload(Album.artist)).all()
+
+
+def main():
+    n_songs = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    n_users, n_artists, n_albums = fill(n_songs)
+    print(f'{n_users} 位會員，{n_artists} 位演出者，{n_albums} 張專輯，{n_songs} 首歌')
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['admin_id'] = 'bench'
+    hx = {'HX-Request': 'true'}
+
+    ok = True
+    print('\n內容管理頁')
+    measure('舊：四張表全部 .all() (只算查詢)', old_manage, 1)
+    measure('新：/admin/manage 第一頁 (會員)', lambda: client.get('/admin/manage'))
+    measure('新：切到歌曲分頁', lambda: client.get('/admin/manage/songs', headers=hx))
+    measure('新：歌曲依名稱排序', lambda: client.get('/admin/manage/songs?sort=title&dir=asc', headers=hx))
+    response = client.get('/admin/manage/songs?sort=title&dir=asc', headers=hx)
+    next_url = response.data.decode().split('load-more-row" hx-get="')[1].split('"')[0].replace('&amp;', '&')
+    measure('新：名稱排序的下一頁 (keyset)', lambda: client.get(next_url, headers=hx))
+    measure('新：搜尋歌名', lambda: client.get('/admin/manage/songs?q=song 0.1234', headers=hx))
+
+    print('\n新增專輯 / 歌曲的選單')
+    measure('舊：演出者 + 專輯全部載入', old_dropdowns, 1)
+    response = measure('新：typeahead (專輯，打 "album 0.12")', lambda: client.get('/admin/typeahead/albums?q=album 0.12'))
+    ok &= 0 < len(response.json['options']) <= app.config['ADMIN_TYPEAHEAD_LIMIT']
+    measure('新：typeahead (演出者，打 "artist 0.5")', lambda: client.get('/admin/typeahead/artists?q=artist 0.5'))
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
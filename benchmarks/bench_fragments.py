@@ -0,0 +1,91 @@
+# 專輯 / 演出者 / 播放清單頁：每次都查資料庫 + 渲染 (清空片段快取) vs 片段快取命中 (只疊上收藏狀態)，
+# 以及 HTMX 帶 If-None-Match 回 304 的延遲和 SQL 數量；最後檢查命中時的輸出和重新渲染的一模一樣。
+# 用法：python benchmarks/bench_fragments.py [每張專輯 / 清單的歌曲數]   (預設 50)
+import os
+import random
+import sys
+import tempfile
+import time
+
+TMP = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(TMP, "bench_fragments.db")}'
+os.environ['FRAGMENT_CACHE'] = '1'  # 只有一個程序，simple 也可以打開
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event  # noqa: E402
+from app import (app, db, User, Artist, Album, Song, Playlist, playlist_songs, user_liked_songs,  # noqa: E402
+                 fragment_cache, rebuild_stats)
+
+ALBUMS = 200
+
+
+def fill(per_page):
+    rng = random.Random(42)
+    n_songs = ALBUMS * per_page
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(user_id=1, email='u@example.com', password_hash='x', display_name='bench'))
+        db.session.execute(Artist.__table__.insert(), [{'artist_id': i, 'name': f'artist {i}', 'bio': 'bio'}
+                                                       for i in range(1, 21)])
+        db.session.execute(Album.__table__.insert(), [{'album_id': i, 'title': f'album {i}', 'artist_id': (i - 1) % 20 + 1,
+                                                       'cover_art_url': f'/media/ab/{i:064x}.png'}
+                                                      for i in range(1, ALBUMS + 1)])
+        db.session.execute(Song.__table__.insert(), [{'song_id': i, 'title': f'song {i}', 'album_id': (i - 1) // per_page + 1,
+                                                      'audio_file_url': f'/media/{i}.mp3', 'duration_minutes': 3,
+                                                      'duration_seconds': i % 60} for i in range(1, n_songs + 1)])
+        db.session.add(Playlist(playlist_id=1, name='mix', user_id=1, is_public=True))
+        db.session.execute(playlist_songs.insert(), [{'playlist_id': 1, 'song_id': s, 'track_order': i * 1024}
+                                                     for i, s in enumerate(rng.sample(range(1, n_songs + 1), per_page))])
+        db.session.execute(user_liked_songs.insert(), [{'user_id': 1, 'song_id': s}
+                                                       for s in rng.sample(range(1, n_songs + 1), n_songs // 10)])
+        db.session.commit()
+        rebuild_stats()
+
+
+def measure(label, fn, runs=200):
+    # 不能包在 app_context 裡 (每個 request 會共用同一個 g 和 session)，直接聽 engine
+    with app.app_context():
+        engine = db.engine
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)  # noqa: E731
+    event.listen(engine, 'before_cursor_execute', listener)
+    try:
+        start = time.perf_counter()
+        for _ in range(runs):
+            response = fn()
+        ms = (time.perf_counter() - start) / runs * 1000
+    finally:
+        event.remove(engine, 'before_cursor_execute', listener)
+    print(f'  {label:30} {ms:8.2f} ms  SQL {len(statements) / runs:4.1f}  {response.status_code}  {len(response.data) / 1024:5.1f} KB')
+    return response
+
+
+def main():
+    per_page = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    fill(per_page)
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = '1'
+    hx = {'HX-Request': 'true'}
+
+    ok = True
+    for url in ('/album/1', '/artist/1', '/playlist/1'):
+        print(f'\n{url} ({per_page} 首)')
+
+        def cold():
+            fragment_cache.clear()
+            return client.get(url, headers=hx)
+        fresh = measure('每次重新查詢 + 渲染', cold)
+        cached = measure('片段快取命中 (HTMX)', lambda: client.get(url, headers=hx))
+        measure('片段快取命中 (完整頁面)', lambda: client.get(url))
+        etag = cached.headers['ETag']
+        measure('If-None-Match → 304', lambda: client.get(url, headers={**hx, 'If-None-Match': etag}))
+        ok &= fresh.data == cached.data
+    print(f'\n快取：{fragment_cache.as_dict()}')
+    print(f'命中時的輸出和重新渲染{"一樣" if ok else "不一樣！"}')
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
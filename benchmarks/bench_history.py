@@ -0,0 +1,142 @@
+# 收聽紀錄：舊的「每個事件一個請求、一個 transaction」(POST /plays) vs 前端整批送 + 伺服器緩衝區整批寫入 (POST /history)
+# 比較送到資料庫的 SQL 數量、commit 次數和總時間，最後檢查兩種方式寫進去的筆數一樣、續播位置正確。
+# 用法：python benchmarks/bench_history.py [使用者數] [每個使用者的事件數]
+import os
+import random
+import sys
+import tempfile
+import time
+
+TMP = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(TMP, "bench_history.db")}'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as music  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from app import app, db, User, Artist, Album, Song, Play, ResumePosition  # noqa: E402
+
+SONGS = 200
+BATCH = 20  # 前端每次送幾筆 (HISTORY_MAX_EVENTS)
+
+
+def fill(users):
+    with app.app_context():
+        db.create_all()
+        db.session.execute(User.__table__.insert(), [{'user_id': u, 'email': f'u{u}@example.com', 'password_hash': 'x'}
+                                                     for u in range(1, users + 1)])
+        db.session.add(Artist(artist_id=1, name='bench'))
+        db.session.add(Album(album_id=1, title='bench', artist_id=1))
+        db.session.execute(Song.__table__.insert(), [{'song_id': s, 'title': f'song {s}', 'album_id': 1}
+                                                     for s in range(1, SONGS + 1)])
+        db.session.commit()
+
+
+def listening(user_id, n):
+    # 一首一首聽：開始、偶爾拖曳 / 暫停、大部分聽完
+    rng = random.Random(user_id)
+    events = []
+    while len(events) < n:
+        song_id = rng.randint(1, SONGS)
+        events.append({'song_id': song_id, 'event': 'start', 'position': 0})
+        if rng.random() < 0.3:
+            events.append({'song_id': song_id, 'event': 'seek', 'position': rng.randint(10, 150)})
+        if rng.random() < 0.2:
+            events.append({'song_id': song_id, 'event': 'pause', 'position': rng.randint(10, 180)})
+        else:
+            events.append({'song_id': song_id, 'event': 'finish', 'position': 200})
+    return events[:n]
+
+
+def expected_resume(streams):
+    # 每個使用者每首歌最後一個事件決定續播位置 (和 record_history 的規則一樣)
+    resume = {}
+    for user_id, events in streams.items():
+        for e in events:
+            key = (user_id, e['song_id'])
+            if e['event'] == 'finish' or e['position'] < app.config['RESUME_MIN_SECONDS']:
+                resume.pop(key, None)
+            else:
+                resume[key] = e['position']
+    return resume
+
+
+def run(label, streams, send):
+    with app.app_context():
+        db.session.execute(Play.__table__.delete())
+        db.session.execute(ResumePosition.__table__.delete())
+        db.session.commit()
+        engine = db.engine
+    music.recent_cache.clear()
+    statements = []
+    commits = []
+    listeners = [('before_cursor_execute', lambda conn, cursor, statement, *args: statements.append(statement)),
+                 ('commit', lambda conn: commits.append(1))]
+    for name, fn in listeners:
+        event.listen(engine, name, fn)
+    start = time.perf_counter()
+    try:
+        for user_id, events in streams.items():
+            client = app.test_client()
+            with client.session_transaction() as sess:
+                sess['_user_id'] = str(user_id)
+            send(client, events)
+        if music.history_buffer:
+            music.history_buffer.flush()
+    finally:
+        for name, fn in listeners:
+            event.remove(engine, name, fn)
+    elapsed = time.perf_counter() - start
+    total = sum(len(events) for events in streams.values())
+    with app.app_context():
+        plays = db.session.query(db.func.count(Play.play_id)).scalar()
+        resume = {(r.user_id, r.song_id): r.position for r in ResumePosition.query}
+    ok = plays == total and resume == expected_resume(streams)
+    print(f'  {label:28} {elapsed:6.2f} s ({total / elapsed:6.0f} 事件/s)  SQL {len(statements):6}  commit {len(commits):5}'
+          f'  plays {plays}  續播 {len(resume)}  {"正確" if ok else "不對！"}')
+    return ok
+
+
+def one_by_one(client, events):
+    for e in events:
+        response = client.post('/history', json={'events': [e]})
+        assert response.status_code == 204, response.data
+
+
+def batched(client, events):
+    for i in range(0, len(events), BATCH):
+        response = client.post('/history', json={'events': events[i:i + BATCH]})
+        assert response.status_code == 204, response.data
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    per_user = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    fill(users)
+    streams = {user_id: listening(user_id, per_user) for user_id in range(1, users + 1)}
+    print(f'{users} 位使用者，每位 {per_user} 個事件')
+    ok = True
+
+    music.history_buffer = None
+    ok &= run('每個事件一個請求，直接寫入', streams, one_by_one)
+    ok &= run(f'每 {BATCH} 筆一個請求，直接寫入', streams, batched)
+    music.history_buffer = music.HistoryBuffer(3600, app.config['HISTORY_FLUSH_SIZE'])  # 不讓背景 thread 插手
+    ok &= run(f'每 {BATCH} 筆一個請求 + 緩衝區', streams, batched)
+    print(f'  緩衝區：{music.history_buffer.counts}')
+
+    with app.app_context():
+        start = time.perf_counter()
+        for user_id in range(1, users + 1):
+            music.recently_played_ids(user_id, 10)
+        cached = (time.perf_counter() - start) / users * 1000
+        music.recent_cache.clear()
+        start = time.perf_counter()
+        for user_id in range(1, users + 1):
+            music.recently_played_ids(user_id, 10)
+        rebuilt = (time.perf_counter() - start) / users * 1000
+    print(f'\n最近播放：快取裡的環狀緩衝 {cached:.3f} ms，快取不見從 plays 重建 {rebuilt:.3f} ms')
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
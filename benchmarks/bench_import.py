@@ -0,0 +1,112 @@
+# flask import-catalog 的吞吐量：假的唱片公司目錄 (預設 10 萬首，2000 位演出者，每張專輯 10 首，三成有客串)，
+# 和舊的「一首一個 transaction」(跟後台上傳完成時一樣：ORM 物件 + 關聯 + commit) 比較；
+# 另外量重跑同一份 manifest (全部略過) 的速度，以及有實際音檔時 (探測 + 複製進檔案庫) 的速度。
+# 預設用暫存的 SQLite；要測 MySQL / PostgreSQL 就設 BENCH_DATABASE_URL 指到一個空的資料庫 (會在裡面建表)。
+# 用法：python benchmarks/bench_import.py [首數] [有音檔的首數]   (預設 100000 2000)
+import csv
+import os
+import sys
+import tempfile
+import time
+import wave
+
+TMP = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = os.environ.get('BENCH_DATABASE_URL') or f'sqlite:///{os.path.join(TMP, "bench_import.db")}'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db, Artist, Album, Song, AlbumStats, import_catalog  # noqa: E402
+
+app.config['MEDIA_FOLDER'] = os.path.join(TMP, 'media')
+
+ARTISTS = 2000
+
+
+def write_manifest(path, n, offset=0, media=False):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        w = csv.writer(f)
+        w.writerow(['id', 'title', 'artist', 'album', 'release_date', 'featuring', 'audio', 'duration'])
+        for i in range(offset, offset + n):
+            artist = f'藝人 {i % ARTISTS}'
+            guest = f'藝人 {(i * 7 + 3) % ARTISTS}' if i % 10 < 3 else ''
+            w.writerow([f'ISRC{i:09d}', f'歌曲 {i}', artist, f'{artist} 的專輯 {i // (ARTISTS * 10)}', '2024-01-01',
+                        guest, f'{i}.wav' if media else '', 180 + i % 120])
+
+
+def write_audio(folder, n, offset):
+    os.makedirs(folder, exist_ok=True)
+    for i in range(offset, offset + n):
+        with wave.open(os.path.join(folder, f'{i}.wav'), 'wb') as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(8000)
+            w.writeframes(i.to_bytes(4, 'little') * 2000)  # 內容不同，hash 才不會重複
+
+
+def old_way(n, offset):
+    # 一首一首：找 / 建演出者和專輯 (各查一次)、建歌曲、加關聯、更新統計、commit
+    start = time.perf_counter()
+    for i in range(offset, offset + n):
+        artist_name = f'舊 {i % ARTISTS}'
+        artist = Artist.query.filter_by(name=artist_name).first()
+        if artist is None:
+            artist = Artist(name=artist_name)
+            db.session.add(artist)
+            db.session.flush()
+        title = f'{artist_name} 的專輯 {i // (ARTISTS * 10)}'
+        album = Album.query.filter_by(artist_id=artist.artist_id, title=title).first()
+        if album is None:
+            album = Album(title=title, artist_id=artist.artist_id)
+            db.session.add(album)
+            db.session.flush()
+            db.session.add(AlbumStats(album_id=album.album_id))
+        song = Song(title=f'歌曲 {i}', album_id=album.album_id, duration_minutes=3, duration_seconds=0)
+        song.artists.append(artist)
+        db.session.add(song)
+        db.session.flush()
+        db.session.query(AlbumStats).filter_by(album_id=album.album_id)\
+            .update({AlbumStats.track_count: AlbumStats.track_count + 1})
+        db.session.commit()
+    return time.perf_counter() - start
+
+
+def report(label, counts):
+    rows = counts['imported'] + counts['skipped'] + counts['failed']
+    print(f'  {label:30} {counts["seconds"]:7.1f} s  匯入 {counts["imported"]:6}  略過 {counts["skipped"]:6}  '
+          f'失敗 {counts["failed"]}  {rows / counts["seconds"]:7.0f} 列/秒')
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    n_media = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    quiet = lambda line: None  # noqa: E731
+    with app.app_context():
+        db.create_all()
+        print(f'資料庫：{db.engine.dialect.name}，{n} 首 (另外 {n_media} 首有音檔)')
+
+        manifest = os.path.join(TMP, 'catalog.csv')
+        write_manifest(manifest, n)
+        report('import-catalog', import_catalog(manifest, log=quiet))
+        report('重跑 (全部略過)', import_catalog(manifest, log=quiet))
+        db.session.remove()
+
+        sample = min(2000, n)
+        seconds = old_way(sample, n)
+        print(f'  {"舊：一首一個 transaction":30} {seconds:7.1f} s  ({sample} 首，{sample / seconds:.0f} 首/秒，'
+              f'{n} 首估計 {seconds / sample * n / 60:.1f} 分鐘)')
+
+        if n_media:
+            media_dir = os.path.join(TMP, 'source')
+            write_audio(media_dir, n_media, n * 2)
+            manifest = os.path.join(TMP, 'with_audio.csv')
+            write_manifest(manifest, n_media, n * 2, media=True)
+            report('有音檔 (探測 + 複製)', import_catalog(manifest, media_dir, log=quiet))
+
+        songs = db.session.query(db.func.count(Song.song_id)).scalar()
+        tracks = db.session.query(db.func.sum(AlbumStats.track_count)).scalar()
+        print(f'  songs {songs} 列，album_stats.track_count 合計 {tracks}  {"一致" if songs == tracks else "不一致！"}')
+        if songs != tracks:
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
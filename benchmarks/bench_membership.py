@@ -0,0 +1,66 @@
+# 收藏狀態判斷的渲染成本：舊的 song in current_user.liked_songs vs 每個 request 一次的 id set
+# 情境：500 首歌的播放清單，使用者收藏了 10k 首歌。
+# 用法：python benchmarks/bench_membership.py [播放清單長度] [收藏數]
+import os
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'bench_membership.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{DB_PATH}'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db, Membership, User, Artist, Album, Song, Playlist, playlist_songs, user_liked_songs  # noqa: E402
+
+REPEAT = 10
+OLD_TEMPLATE = '{% for song in songs %}{% if song in user.liked_songs %}♥{% else %}♡{% endif %}{% endfor %}'
+NEW_TEMPLATE = '{% for song in songs %}{% if is_liked(song.song_id) %}♥{% else %}♡{% endif %}{% endfor %}'
+
+
+def fill(playlist_len, n_likes):
+    db.create_all()
+    n_songs = max(playlist_len, n_likes) * 2
+    db.session.execute(User.__table__.insert(), [{'user_id': 1, 'email': 'bench@example.com', 'password_hash': 'x'}])
+    db.session.execute(Artist.__table__.insert(), [{'artist_id': 1, 'name': 'bench'}])
+    db.session.execute(Album.__table__.insert(), [{'album_id': 1, 'title': 'bench', 'artist_id': 1}])
+    db.session.execute(Song.__table__.insert(), [{'song_id': i, 'title': f'song {i}', 'album_id': 1,
+                                                  'duration_minutes': 3, 'duration_seconds': 0}
+                                                 for i in range(1, n_songs + 1)])
+    db.session.execute(Playlist.__table__.insert(), [{'playlist_id': 1, 'name': 'bench', 'user_id': 1}])
+    # 播放清單一半是收藏過的歌、一半不是
+    db.session.execute(playlist_songs.insert(), [{'playlist_id': 1, 'song_id': i * 2} for i in range(1, playlist_len + 1)])
+    db.session.execute(user_liked_songs.insert(), [{'user_id': 1, 'song_id': i} for i in range(1, n_likes + 1)])
+    db.session.commit()
+
+
+def timed(fn):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        fn()
+    return (time.perf_counter() - start) / REPEAT * 1000
+
+
+if __name__ == '__main__':
+    playlist_len = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    n_likes = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    with app.app_context():
+        fill(playlist_len, n_likes)
+        songs = db.session.get(Playlist, 1).songs
+        old = app.jinja_env.from_string(OLD_TEMPLATE)
+        new = app.jinja_env.from_string(NEW_TEMPLATE)
+
+        user = db.session.get(User, 1)
+
+        def render_old():
+            db.session.expire(user, ['liked_songs'])  # 每個 request 都會重新載入一次
+            return old.render(songs=songs, user=user)
+
+        def render_new():
+            liked = Membership(1).songs
+            return new.render(songs=songs, is_liked=lambda song_id: song_id in liked)
+
+        assert render_old() == render_new()
+        old_ms, new_ms = timed(render_old), timed(render_new)
+        print(f'播放清單 {playlist_len} 首 / 收藏 {n_likes:,} 首 (含載入收藏的查詢時間)')
+        print(f'  song in current_user.liked_songs : {old_ms:8.2f} ms')
+        print(f'  is_liked(song_id) + id set      : {new_ms:8.2f} ms  ({old_ms / new_ms:.1f}x)')
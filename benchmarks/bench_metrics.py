@@ -0,0 +1,68 @@
+# 效能量測本身的成本：同一批頁面在 METRICS_ENABLED 開 / 關時的延遲，以及 /metrics 輸出 (所有 endpoint 的 histogram) 要多久。
+# 用法：python benchmarks/bench_metrics.py [每個頁面跑幾次]   (預設 300)
+import os
+import sys
+import tempfile
+import time
+
+TMP = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(TMP, "bench_metrics.db")}'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db, User, Artist, Album, Song, Playlist, playlist_songs, rebuild_stats  # noqa: E402
+
+URLS = ['/album/1', '/artist/1', '/playlist/1', '/library', '/collection/tracks', '/search?q=song 1', '/queue']
+
+
+def fill():
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(user_id=1, email='u@example.com', password_hash='x', display_name='bench'))
+        db.session.execute(Artist.__table__.insert(), [{'artist_id': i, 'name': f'artist {i}'} for i in range(1, 11)])
+        db.session.execute(Album.__table__.insert(), [{'album_id': i, 'title': f'album {i}', 'artist_id': (i - 1) % 10 + 1}
+                                                      for i in range(1, 101)])
+        db.session.execute(Song.__table__.insert(), [{'song_id': i, 'title': f'song {i}', 'album_id': (i - 1) // 20 + 1,
+                                                      'audio_file_url': f'/media/{i}.mp3', 'duration_minutes': 3,
+                                                      'duration_seconds': i % 60} for i in range(1, 2001)])
+        db.session.add(Playlist(playlist_id=1, name='mix', user_id=1, is_public=True))
+        db.session.execute(playlist_songs.insert(), [{'playlist_id': 1, 'song_id': s, 'track_order': s * 1024}
+                                                     for s in range(1, 51)])
+        db.session.commit()
+        rebuild_stats()
+
+
+def run(client, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        for url in URLS:
+            response = client.get(url)
+            assert response.status_code == 200, (url, response.status_code)
+    return (time.perf_counter() - start) / (runs * len(URLS)) * 1000
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    fill()
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = '1'
+    run(client, 5)  # 暖機 (搜尋索引、片段快取)
+
+    results = {}
+    for enabled in (False, True, False, True):  # 交錯跑，減少機器忙碌程度的影響
+        app.config['METRICS_ENABLED'] = enabled
+        results.setdefault(enabled, []).append(run(client, runs))
+    off, on = min(results[False]), min(results[True])
+    print(f'{len(URLS)} 個頁面 × {runs} 次')
+    print(f'  關閉量測   {off:7.3f} ms / request')
+    print(f'  開啟量測   {on:7.3f} ms / request  (多 {on - off:+.3f} ms，{(on - off) / off:+.1%})')
+
+    start = time.perf_counter()
+    for _ in range(100):
+        text = client.get('/metrics').data.decode()
+    lines = len(text.splitlines())
+    print(f'  /metrics   {(time.perf_counter() - start) * 10:7.3f} ms  ({len(text) / 1024:.1f} KB，{lines} 行)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+# 伺服器端播放佇列：整張播放清單 (QUEUE_MAX_SONGS 首) 排進佇列、下一首、開關隨機、電台補歌的延遲，
+# 以及每次回應的大小 (只帶接下來幾首) vs 把整個清單送給前端。
+# 用法：python benchmarks/bench_queue.py [歌曲數量]   (預設 100000)
+import os
+import random
+import sys
+import tempfile
+import time
+
+TMP = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(TMP, "bench_queue.db")}'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json  # noqa: E402
+from app import (app, db, User, Artist, Album, Song, Playlist, playlist_songs, PlayQueue,  # noqa: E402
+                 queue_entries, rebuild_stats)
+
+
+def fill(n_songs):
+    rng = random.Random(42)
+    n_artists = max(10, n_songs // 500)
+    n_albums = n_artists * 5
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(user_id=1, email='u@example.com', password_hash='x'))
+        db.session.execute(Artist.__table__.insert(), [{'artist_id': i, 'name': f'artist {i}'} for i in range(1, n_artists + 1)])
+        db.session.execute(Album.__table__.insert(),
+                           [{'album_id': i, 'title': f'album {i}', 'artist_id': (i - 1) % n_artists + 1,
+                             'cover_art_url': f'/media/ab/{i:064x}.png'} for i in range(1, n_albums + 1)])
+        db.session.execute(Song.__table__.insert(),
+                           [{'song_id': i, 'title': f'song {i}', 'album_id': rng.randint(1, n_albums),
+                             'audio_file_url': f'/media/cd/{i}.mp3', 'duration_minutes': 3, 'duration_seconds': 30}
+                            for i in range(1, n_songs + 1)])
+        db.session.add(Playlist(playlist_id=1, name='big', user_id=1))
+        size = app.config['QUEUE_MAX_SONGS']
+        db.session.execute(playlist_songs.insert(),
+                           [{'playlist_id': 1, 'song_id': s, 'track_order': i * 1024}
+                            for i, s in enumerate(rng.sample(range(1, n_songs + 1), size))])
+        db.session.commit()
+        rebuild_stats()
+
+
+def timed(label, fn, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        response = fn()
+        assert response.status_code == 200, response.data[:200]
+    ms = (time.perf_counter() - start) / runs * 1000
+    print(f'  {label:34} {ms:8.2f} ms  ({len(response.data) / 1024:.1f} KB)')
+
+
+def main():
+    n_songs = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    fill(n_songs)
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = '1'
+
+    size = app.config['QUEUE_MAX_SONGS']
+    print(f'{n_songs} 首歌，播放清單 {size} 首')
+    timed('排入整個播放清單', lambda: client.post('/queue', json={'source': 'playlist:1'}), 20)
+    timed('下一首', lambda: client.post('/queue/next'), 200)
+    timed('開啟隨機 (洗牌剩下的)', lambda: client.put('/queue/mode', json={'shuffle': True}), 1)
+    timed('下一首 (隨機)', lambda: client.post('/queue/next'), 200)
+    timed('關閉隨機 (換回原本順序)', lambda: client.put('/queue/mode', json={'shuffle': False}), 1)
+    timed('演出者電台 (第一批)', lambda: client.post('/queue/radio/1'), 5)
+    timed('下一首 (電台，必要時補歌)', lambda: client.post('/queue/next'), 200)
+    timed('讀取佇列 (重新整理)', lambda: client.get('/queue'), 200)
+
+    with app.app_context():
+        queue = db.session.get(PlayQueue, 1)
+        radio = [int(x) for x in queue.song_ids.split(',')]
+        print(f'  電台播了 200 首，佇列 {len(radio)} 首，重複 {len(radio) - len(set(radio))} 首')
+        with app.test_request_context():
+            full = json.dumps(queue_entries(list(range(1, size + 1))))
+    print(f'\n整份 {size} 首的清單送給前端自己洗牌：{len(full) / 1024:.0f} KB')
+
+
+if __name__ == '__main__':
+    main()
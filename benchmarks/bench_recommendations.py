@@ -0,0 +1,151 @@
+# 推薦工作在 100 萬筆互動下的表現，以及首頁「推薦藝人」查詢 vs 舊的 ORDER BY random()
+# 假資料：使用者分成 50 種口味，每種口味偏好同一群演出者 (80%)，熱門程度呈長尾分布。
+# 用法：python benchmarks/bench_recommendations.py [互動筆數]
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+TMP = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(TMP, "bench_recommendations.db")}'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+from sqlalchemy import func  # noqa: E402
+from app import (app, db, Artist, ItemNeighbor, UserRecommendation, build_recommendations,  # noqa: E402
+                 recommended_artists)
+
+GENRES = 50
+rng = np.random.default_rng(42)
+
+
+def pick_artists(users, n_artists):
+    # 80% 選自己口味的演出者，20% 隨便選；越前面的越熱門
+    genre = users % GENRES
+    per_genre = n_artists // GENRES
+    own = (per_genre * rng.random(len(users)) ** 3).astype(np.int64) * GENRES + genre
+    other = (n_artists * rng.random(len(users)) ** 3).astype(np.int64)
+    return np.where(rng.random(len(users)) < 0.8, own, other)
+
+
+def fill(total):
+    n_users = max(total // 30, 100)
+    n_artists = max(total // 200, GENRES * 2)
+    n_albums = n_artists * 4          # 專輯 a 屬於演出者 a % n_artists
+    n_songs = n_albums * 5            # 歌曲 s 屬於專輯 s % n_albums
+    shares = dict(liked_song=0.6, playlist_song=0.3, liked_album=0.05, followed=0.05)
+    past = datetime.utcnow() - timedelta(days=30)
+
+    def songs_for(users):
+        artist = pick_artists(users, n_artists)
+        album = artist + n_artists * rng.integers(0, 4, len(users))
+        return album + n_albums * rng.integers(0, 5, len(users))
+
+    def unique_pairs(a, b):
+        pairs = np.unique(np.stack([a, b], axis=1), axis=0)
+        return pairs[:, 0], pairs[:, 1]
+
+    with app.app_context():
+        db.create_all()
+        conn = db.engine.raw_connection()
+        cur = conn.cursor()
+        cur.executemany('INSERT INTO users (user_id, email, password_hash) VALUES (?, ?, ?)',
+                        [(u + 1, f'u{u}@example.com', 'x') for u in range(n_users)])
+        cur.executemany('INSERT INTO artists (artist_id, name) VALUES (?, ?)',
+                        [(a + 1, f'artist {a}') for a in range(n_artists)])
+        cur.executemany('INSERT INTO albums (album_id, title, artist_id) VALUES (?, ?, ?)',
+                        [(a + 1, f'album {a}', a % n_artists + 1) for a in range(n_albums)])
+        cur.executemany('INSERT INTO songs (song_id, title, album_id, duration_minutes, duration_seconds) VALUES (?, ?, ?, 3, 30)',
+                        [(s + 1, f'song {s}', s % n_albums + 1) for s in range(n_songs)])
+
+        n = int(total * shares['liked_song'])
+        users = rng.integers(0, n_users, n)
+        users, songs = unique_pairs(users, songs_for(users))
+        cur.executemany('INSERT INTO user_liked_songs (user_id, song_id, liked_at) VALUES (?, ?, ?)',
+                        zip((users + 1).tolist(), (songs + 1).tolist(), [past] * len(users)))
+        liked = len(users)
+
+        # 每個使用者 1 個播放清單，歌曲依口味挑
+        n = int(total * shares['playlist_song'])
+        cur.executemany('INSERT INTO playlists (playlist_id, name, user_id, is_public) VALUES (?, ?, ?, 0)',
+                        [(u + 1, f'list {u}', u + 1) for u in range(n_users)])
+        owners = rng.integers(0, n_users, n)
+        owners, songs = unique_pairs(owners, songs_for(owners))
+        cur.executemany('INSERT INTO playlist_songs (playlist_id, song_id, track_order, added_at) VALUES (?, ?, ?, ?)',
+                        zip((owners + 1).tolist(), (songs + 1).tolist(), range(len(owners)), [past] * len(owners)))
+        listed = len(owners)
+
+        n = int(total * shares['liked_album'])
+        users = rng.integers(0, n_users, n)
+        users, albums = unique_pairs(users, pick_artists(users, n_artists) + n_artists * rng.integers(0, 4, n))
+        cur.executemany('INSERT INTO user_liked_albums (user_id, album_id, liked_at) VALUES (?, ?, ?)',
+                        zip((users + 1).tolist(), (albums + 1).tolist(), [past] * len(users)))
+        liked_albums = len(users)
+
+        n = int(total * shares['followed'])
+        users = rng.integers(0, n_users, n)
+        users, artists = unique_pairs(users, pick_artists(users, n_artists))
+        cur.executemany('INSERT INTO user_followed_artists (user_id, artist_id, followed_at) VALUES (?, ?, ?)',
+                        zip((users + 1).tolist(), (artists + 1).tolist(), [past] * len(users)))
+        followed = len(users)
+        conn.commit()
+        conn.close()
+    count = liked + listed + liked_albums + followed
+    print(f'{n_users} 位使用者，{n_artists} 位演出者，{n_albums} 張專輯，{n_songs} 首歌；'
+          f'互動 {count} 筆 (收藏歌曲 {liked}、清單 {listed}、收藏專輯 {liked_albums}、追蹤 {followed})')
+    return n_users, n_songs
+
+
+def add_new_interactions(n, n_users, n_songs):
+    # 模擬兩次執行之間新增的互動 (時間 = 現在)
+    users = rng.integers(0, n_users, n) + 1
+    songs = rng.integers(0, n_songs, n) + 1
+    now = datetime.utcnow() + timedelta(minutes=1)
+    with app.app_context():
+        conn = db.engine.raw_connection()
+        conn.cursor().executemany('INSERT OR IGNORE INTO user_liked_songs (user_id, song_id, liked_at) VALUES (?, ?, ?)',
+                                  zip(users.tolist(), songs.tolist(), [now] * n))
+        conn.commit()
+        conn.close()
+
+
+def timed(label, fn, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    ms = (time.perf_counter() - start) / runs * 1000
+    print(f'  {label:36} {ms:8.2f} ms')
+    return ms
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    n_users, n_songs = fill(total)
+
+    with app.app_context():
+        print('\n第一次 (--full)')
+        start = time.perf_counter()
+        build_recommendations(full=True, log=lambda line: print('  ' + line))
+        print(f'  合計 {time.perf_counter() - start:.1f}s')
+
+        add_new_interactions(5000, n_users, n_songs)
+        print('\n新增 5000 筆收藏之後的增量執行')
+        start = time.perf_counter()
+        build_recommendations(log=lambda line: print('  ' + line))
+        print(f'  合計 {time.perf_counter() - start:.1f}s')
+
+        neighbors = db.session.query(func.count()).select_from(ItemNeighbor).scalar()
+        recs = db.session.query(func.count()).select_from(UserRecommendation).scalar()
+        print(f'\nitem_neighbors {neighbors} 列，user_recommendations {recs} 列')
+
+        print('\n首頁推薦藝人 (每次查詢)')
+        user_ids = iter(rng.integers(1, n_users + 1, 1000).tolist())
+        timed('舊：ORDER BY random() LIMIT 6', lambda: Artist.query.order_by(func.random()).limit(6).all(), 50)
+        timed('新：recommended_artists()', lambda: recommended_artists(next(user_ids)), 500)
+        artists, personalized = recommended_artists(1)
+        print(f'  使用者 1 的推薦：{[a.name for a in artists]} (個人化 = {personalized})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+# 每小時收聽送出多少流量：直接送管理員上傳的原始檔 (WAV / MP3) vs /stream 依會員等級 + 頻寬挑的轉檔版本
+# 音源：static/music 裡的範例歌曲前 60 秒，解碼成 WAV 當作「管理員上傳的檔案」。
+# 用法：python benchmarks/bench_renditions.py [秒數]
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+TMP = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(TMP, "bench_renditions.db")}'
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app import (app, db, User, Artist, Album, Song, ffmpeg_binary, transcode_audio, transcode_args,  # noqa: E402
+                 store_renditions)
+
+SAMPLE = os.path.join(ROOT, 'static', 'music', 'ijnbuh.mp3')
+
+# (名稱, 會員等級, 播放器量到的頻寬 kbps (0 = 不知道), 佔聽眾比例)
+LISTENERS = [
+    ('Free 行動網路', 'Free', 200, 0.35),
+    ('Free 寬頻', 'Free', 20000, 0.35),
+    ('Premium 行動網路', 'Premium', 200, 0.10),
+    ('Premium 寬頻', 'Premium', 20000, 0.20),
+]
+
+
+def fill(seconds):
+    # 用暫存資料夾當 static，才不會把測試檔寫進專案
+    static = os.path.join(TMP, 'static')
+    os.makedirs(os.path.join(static, 'music'))
+    app.static_folder = static
+    app.config['RENDITION_FOLDER'] = os.path.join(static, 'renditions')
+    ffmpeg = ffmpeg_binary()
+    wav = os.path.join(static, 'music', 'upload.wav')
+    mp3 = os.path.join(static, 'music', 'upload.mp3')
+    subprocess.run([ffmpeg, '-nostdin', '-loglevel', 'error', '-y', '-i', SAMPLE, '-t', str(seconds), wav], check=True)
+    subprocess.run([ffmpeg, '-nostdin', '-loglevel', 'error', '-y', '-i', wav, '-b:a', '320k', mp3], check=True)
+
+    with app.app_context():
+        db.create_all()
+        for user_id, tier in ((1, 'Free'), (2, 'Premium')):
+            db.session.add(User(user_id=user_id, email=f'{tier}@example.com', password_hash='x', subscription_type=tier))
+        db.session.add(Artist(artist_id=1, name='bench'))
+        db.session.add(Album(album_id=1, title='bench', artist_id=1))
+        db.session.add(Song(song_id=1, title='wav upload', album_id=1, audio_file_url='/static/music/upload.wav'))
+        db.session.add(Song(song_id=2, title='mp3 upload', album_id=1, audio_file_url='/static/music/upload.mp3'))
+        db.session.commit()
+        for song_id, src in ((1, wav), (2, mp3)):
+            store_renditions(song_id, transcode_audio(*transcode_args(song_id, src)))
+
+
+def bytes_per_hour(client, url, seconds):
+    response = client.get(url)
+    assert response.status_code == 200, (url, response.status_code)
+    return len(response.data) / seconds * 3600
+
+
+def main():
+    seconds = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    fill(seconds)
+    clients = {}
+    for user_id, tier in ((1, 'Free'), (2, 'Premium')):
+        clients[tier] = app.test_client()
+        with clients[tier].session_transaction() as sess:
+            sess['_user_id'] = str(user_id)
+
+    print(f'每小時收聽的流量 (MB)，音源 {seconds} 秒')
+    for song_id, upload in ((1, 'WAV'), (2, 'MP3 320k')):
+        original = os.path.getsize(os.path.join(app.static_folder, 'music', f'upload.{upload[:3].lower()}'))
+        before = original / seconds * 3600
+        print(f'\n上傳格式：{upload}')
+        print(f'{"聽眾":16} {"比例":>6} {"原始檔":>10} {"轉檔後":>10}')
+        total_after = 0
+        for name, tier, bandwidth, share in LISTENERS:
+            url = f'/stream/{song_id}' + (f'?max_kbps={bandwidth // 2}' if bandwidth else '')
+            after = bytes_per_hour(clients[tier], url, seconds)
+            total_after += after * share
+            print(f'{name:16} {share:6.0%} {before / 2**20:10.1f} {after / 2**20:10.1f}')
+        print(f'{"加權平均":16} {"":6} {before / 2**20:10.1f} {total_after / 2**20:10.1f}'
+              f'   ({total_after / before:.0%})')
+    shutil.rmtree(TMP)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+# 隨機挑歌：舊的 ORDER BY random() LIMIT k vs RandomSampler (記憶體 id 陣列 + 一次 IN 查詢)
+# 另外檢查加權抽樣的分布、同一個種子結果固定、後台新增的 id 立刻抽得到。
+# 用法：python benchmarks/bench_sampler.py [歌曲數量 ...]   (預設 10000 100000 1000000)
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'bench_sampler.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{DB_PATH}'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func  # noqa: E402
+from app import app, db, Song, Album, Artist, SongPopularity, RandomSampler  # noqa: E402
+
+K = 20
+REPEAT = 20
+
+
+def fill(n_songs):
+    rng = random.Random(42)
+    db.drop_all()
+    db.create_all()
+    n_albums = max(1, n_songs // 10)
+    db.session.execute(Artist.__table__.insert(), [{'artist_id': 1, 'name': 'bench'}])
+    db.session.execute(Album.__table__.insert(),
+                       [{'album_id': i, 'title': f'album {i}', 'artist_id': 1} for i in range(1, n_albums + 1)])
+    for start in range(1, n_songs + 1, 50000):
+        stop = min(start + 50000, n_songs + 1)
+        db.session.execute(Song.__table__.insert(),
+                           [{'song_id': i, 'title': f'song {i}', 'album_id': rng.randint(1, n_albums),
+                             'audio_file_url': f'/media/{i}.mp3'} for i in range(start, stop)])
+    # 前 1% 的歌很熱門 (播放 10000 次)，其他 0~10 次
+    db.session.execute(SongPopularity.__table__.insert(),
+                       [{'song_id': i, 'artist_id': 1, 'play_count': 10000 if i <= n_songs // 100 else rng.randint(0, 10),
+                         'finish_count': 0} for i in range(1, n_songs + 1)])
+    db.session.commit()
+
+
+def timed(label, fn, runs=REPEAT):
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    ms = (time.perf_counter() - start) / runs * 1000
+    print(f'  {label:32} {ms:9.2f} ms')
+    return ms
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [10000, 100000, 1000000]
+    ok = True
+    with app.app_context():
+        for n_songs in sizes:
+            fill(n_songs)
+            print(f'\n{n_songs} 首歌，每次挑 {K} 首')
+            old = timed('舊：ORDER BY random()', lambda: Song.query.order_by(func.random()).limit(K).all())
+
+            sampler = RandomSampler()
+            start = time.perf_counter()
+            sampler.build('song')
+            print(f'  {"建立 id 陣列":32} {(time.perf_counter() - start) * 1000:9.2f} ms'
+                  f'  ({len(sampler.ids["song"]) * 16 / 1024 / 1024:.1f} MB)')
+            start = time.perf_counter()
+            sampler.sample('song', K, weighted=True)
+            print(f'  {"建立 alias 表 (第一次加權)":32} {(time.perf_counter() - start) * 1000:9.2f} ms')
+            new = timed('新：均勻抽樣 + IN', lambda: sampler.fetch('song', K))
+            timed('新：加權抽樣 + IN', lambda: sampler.fetch('song', K, weighted=True))
+            timed('只抽 id (不查資料庫)', lambda: sampler.sample('song', K, weighted=True), 1000)
+            print(f'  快 {old / new:.0f} 倍')
+
+            # 熱門的 1% 歌曲權重是 1 + log1p(10000) ≈ 10.2，其他平均約 2.9，理論上占 1% × 10.2 / (1% × 10.2 + 99% × 2.9) ≈ 3.4%
+            draws = Counter()
+            for _ in range(2000):
+                draws.update(sampler.sample('song', K, weighted=True))
+            hot = sum(c for song_id, c in draws.items() if song_id <= n_songs // 100) / sum(draws.values())
+            print(f'  加權抽樣中熱門 1% 的比例 {hot:.1%}')
+
+            seed = 'user-1:abcd'
+            same = sampler.sample('song', K, seed=seed) == sampler.sample('song', K, seed=seed)
+            db.session.execute(Song.__table__.insert(), [{'song_id': n_songs + 1, 'title': 'new', 'album_id': 1,
+                                                          'audio_file_url': '/media/new.mp3'}])
+            db.session.commit()
+            sampler.upsert('song', n_songs + 1)
+            found = n_songs + 1 in sampler.ids['song']
+            print(f'  同一個種子結果相同 {same}，新增的歌立刻在陣列裡 {found}')
+            ok &= same and found and 0.02 < hot < 0.2
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
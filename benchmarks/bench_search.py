@@ -0,0 +1,112 @@
+# 搜尋效能比較：舊的 ilike('%q%') vs 程序內 bigram 索引；
+# 最後檢查建議索引逐筆改名 / 刪除多單字名稱 之後，結果跟整個重建的一模一樣。
+# 用法：python benchmarks/bench_search.py [歌曲數量 ...]   (預設 10000 100000 1000000)
+# 會在暫存資料夾建一個 SQLite 資料庫灌入假資料，不會動到正式資料庫。
+import os
+import random
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'bench_search.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{DB_PATH}'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db, search_index, suggest_index, SuggestIndex, _fetch_in_order, Song, Album, Artist  # noqa: E402
+
+WORDS = ['love', 'night', 'rain', 'summer', 'dream', 'fire', 'blue', 'heart', 'city', 'star',
+         '晴天', '夜曲', '七里香', '稻香', '告白', '氣球', '青花瓷', '彩虹', '雨', '海']
+QUERIES = ['love', 'dream', 'heart c', '晴天', '青花', 'zzz', 'o']
+REPEAT = 5
+
+
+def fill(n_songs):
+    rng = random.Random(42)
+    db.drop_all()
+    db.create_all()
+    n_artists = max(1, n_songs // 100)
+    n_albums = max(1, n_songs // 10)
+    db.session.execute(Artist.__table__.insert(),
+                       [{'artist_id': i, 'name': f'{rng.choice(WORDS)} band {i}'} for i in range(1, n_artists + 1)])
+    db.session.execute(Album.__table__.insert(),
+                       [{'album_id': i, 'title': f'{rng.choice(WORDS)} {rng.choice(WORDS)}',
+                         'artist_id': rng.randint(1, n_artists)} for i in range(1, n_albums + 1)])
+    batch = []
+    for i in range(1, n_songs + 1):
+        title = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 3)))
+        batch.append({'song_id': i, 'title': f'{title} {i}', 'album_id': rng.randint(1, n_albums),
+                      'duration_minutes': 3, 'duration_seconds': 30})
+        if len(batch) == 50000:
+            db.session.execute(Song.__table__.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(Song.__table__.insert(), batch)
+    db.session.commit()
+
+
+def timed(fn):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        fn()
+    return (time.perf_counter() - start) / REPEAT * 1000
+
+
+def run(n_songs):
+    fill(n_songs)
+    start = time.perf_counter()
+    search_index.build()
+    build_s = time.perf_counter() - start
+    limit = app.config['SEARCH_RESULT_LIMIT']
+    print(f'\n== {n_songs:,} 首歌 (索引建立 {build_s:.2f}s) ==')
+    # ilike = 原本 search() 的做法 (全部撈出來、沒有排序)；index = 排序後的前 N 筆 id；+fetch = 再加上一次 IN 查詢取回 ORM 物件
+    print(f'{"查詢":<10}{"ilike (ms)":>12}{"index (ms)":>12}{"+fetch (ms)":>13}{"命中數":>9}')
+    for q in QUERIES:
+        ilike_ms = timed(lambda: Song.query.filter(Song.title.ilike(f'%{q}%')).all())
+        index_ms = timed(lambda: search_index.query('song', q, limit))
+        fetch_ms = timed(lambda: _fetch_in_order(Song, Song.song_id, search_index.query('song', q, limit)))
+        hits = len(search_index.query('song', q))
+        print(f'{q:<10}{ilike_ms:>12.2f}{index_ms:>12.2f}{fetch_ms:>13.2f}{hits:>9}')
+        db.session.expunge_all()
+    check_suggest_updates()
+
+
+def check_suggest_updates():
+    # 多單字名稱有好幾個 key (每個單字開頭)，改名和刪除都要整組拿掉，不然之後的 suggest 會 KeyError
+    rng = random.Random(7)
+    suggest_index.build()
+    artists = db.session.query(Artist).order_by(Artist.artist_id).limit(50).all()
+    songs = db.session.query(Song).order_by(Song.song_id).limit(200).all()
+    start = time.perf_counter()
+    for obj in artists + songs:
+        if isinstance(obj, Song) and rng.random() < 0.3:
+            suggest_index.remove('song', obj.song_id)
+            db.session.delete(obj)
+            continue
+        name = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 3)))
+        if isinstance(obj, Artist):
+            obj.name = name
+            suggest_index.upsert('artist', obj.artist_id, name, f'/artist/{obj.artist_id}')
+        else:
+            obj.title = name
+            suggest_index.upsert('song', obj.song_id, name, f'/album/{obj.album_id}')
+    update_ms = (time.perf_counter() - start) / (len(artists) + len(songs)) * 1000
+    db.session.flush()
+    fresh = SuggestIndex()
+    fresh.build()
+    prefixes = {w[:n] for w in WORDS for n in range(1, len(w) + 1)} | {'band', 'b', 'love n'}
+    # 同分 (同類型、同名) 的先後不一定，只比類型和文字
+    shown = lambda index, q, limit: [(s['type'], s['text']) for s in index.suggest(q, limit)]  # noqa: E731
+    wrong = [q for q in sorted(prefixes) for limit in (5, 10, 20)
+             if shown(suggest_index, q, limit) != shown(fresh, q, limit)]
+    db.session.rollback()
+    print(f'\n建議索引逐筆更新 {update_ms:.3f} ms / 筆，{len(prefixes)} 個前綴和重建結果'
+          f'{"一樣" if not wrong else f"不一樣：{wrong[:10]}"}')
+    if wrong:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    with app.app_context():
+        for size in sizes:
+            run(size)
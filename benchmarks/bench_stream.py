@@ -0,0 +1,155 @@
+# 一個 gunicorn sync worker 能同時服務多少聽眾：舊的 /static/music 整檔下載 vs /stream/<song_id>
+# 每個聽眾用限速的 client 模擬 (接收緩衝區設小，伺服器送得比 client 收得快時 worker 就會卡住等)，
+# 量測 worker 在固定時間內服務完幾個請求 (= 每個 worker 每秒能接幾個聽眾)。
+#   static       舊做法：播放器直接抓整個靜態檔
+#   stream       /stream 整檔 (gunicorn 用 sendfile)
+#   stream-seek  /stream 拖曳進度條：Range 抓 512KB
+#   stream-304   重播：If-None-Match 命中，只回 304
+#   x-accel      STREAM_OFFLOAD=x-accel：worker 只回 header，檔案由 nginx 送 (這裡只量 worker 端)
+# 用法：python benchmarks/bench_stream.py [同時聽眾數] [每秒 KB (client 頻寬)] [每種情境秒數]
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'bench_stream.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{DB_PATH}'
+sys.path.insert(0, ROOT)
+
+from app import app, db, User, Artist, Album, Song, generate_password_hash  # noqa: E402
+
+FILE_SIZE = 4 * 1024 * 1024
+SEEK_SIZE = 512 * 1024
+AUDIO_NAME = f'_bench_stream_{os.getpid()}.mp3'
+AUDIO_PATH = os.path.join(app.static_folder, 'music', AUDIO_NAME)
+
+
+def fill():
+    with open(AUDIO_PATH, 'wb') as f:
+        f.write(os.urandom(FILE_SIZE))
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(user_id=1, email='bench@example.com', password_hash=generate_password_hash('bench')))
+        db.session.add(Artist(artist_id=1, name='bench'))
+        db.session.add(Album(album_id=1, title='bench', artist_id=1))
+        db.session.add(Song(song_id=1, title='bench', album_id=1, audio_file_url=f'/static/music/{AUDIO_NAME}'))
+        db.session.commit()
+
+
+def start_server(port, offload=''):
+    env = dict(os.environ, STREAM_OFFLOAD=offload)
+    proc = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-w', '1', '-k', 'sync', '-t', '120',
+                             '-b', f'127.0.0.1:{port}', 'app:app'],
+                            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.1).close()
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise SystemExit('gunicorn 沒有啟動成功 (pip install gunicorn)')
+
+
+def request(port, method, path, headers=(), body=b'', kbps=0):
+    # HTTP/1.0 + Connection: close，讀到 EOF 為止；kbps > 0 時限制接收速度
+    sock = socket.socket()
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 64 * 1024)
+    sock.connect(('127.0.0.1', port))
+    lines = [f'{method} {path} HTTP/1.0', 'Host: localhost', 'Connection: close', *headers]
+    if body:
+        lines.append(f'Content-Length: {len(body)}')
+    sock.sendall(('\r\n'.join(lines) + '\r\n\r\n').encode() + body)
+    data = bytearray()
+    start = time.perf_counter()
+    while True:
+        chunk = sock.recv(64 * 1024)
+        if not chunk:
+            break
+        data += chunk
+        if kbps:
+            ahead = len(data) / (kbps * 1024) - (time.perf_counter() - start)
+            if ahead > 0:
+                time.sleep(ahead)
+    sock.close()
+    head, _, payload = bytes(data).partition(b'\r\n\r\n')
+    return head.decode('latin-1'), payload
+
+
+def login(port):
+    form = urllib.parse.urlencode({'email': 'bench@example.com', 'password': 'bench'}).encode()
+    head, _ = request(port, 'POST', '/login', ['Content-Type: application/x-www-form-urlencoded'], form)
+    cookie = next(line.split(':', 1)[1].split(';')[0].strip()
+                  for line in head.split('\r\n') if line.lower().startswith('set-cookie:'))
+    return f'Cookie: {cookie}'
+
+
+def run(port, listeners, seconds, make_request):
+    served = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def listener():
+        while time.perf_counter() < deadline:
+            make_request()
+            with lock:
+                served[0] += 1
+
+    threads = [threading.Thread(target=listener) for _ in range(listeners)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return served[0] / (time.perf_counter() - start)
+
+
+def main():
+    listeners = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    kbps = int(sys.argv[2]) if len(sys.argv) > 2 else 8 * 1024
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 5
+    fill()
+    print(f'{listeners} 個聽眾同時連線，client 頻寬 {kbps} KB/s，音檔 {FILE_SIZE // 1024} KB，1 個 sync worker')
+    print(f'{"情境":14} {"每秒服務聽眾":>12} {"平均佔用 worker (ms)":>22}')
+
+    try:
+        for offload in ('', 'x-accel'):
+            port = random.randint(20000, 40000)
+            proc = start_server(port, offload)
+            try:
+                cookie = login(port)
+
+                def seek():
+                    start = random.randrange(0, FILE_SIZE - SEEK_SIZE)
+                    request(port, 'GET', '/stream/1', [cookie, f'Range: bytes={start}-{start + SEEK_SIZE - 1}'], kbps=kbps)
+
+                if offload:
+                    cases = [('x-accel', lambda: request(port, 'GET', '/stream/1', [cookie], kbps=kbps))]
+                else:
+                    head, _ = request(port, 'GET', '/stream/1', [cookie])
+                    etag = next(line.split(':', 1)[1].strip()
+                                for line in head.split('\r\n') if line.lower().startswith('etag:'))
+                    cases = [
+                        ('static', lambda: request(port, 'GET', f'/static/music/{AUDIO_NAME}', kbps=kbps)),
+                        ('stream', lambda: request(port, 'GET', '/stream/1', [cookie], kbps=kbps)),
+                        ('stream-seek', seek),
+                        ('stream-304', lambda: request(port, 'GET', '/stream/1', [cookie, f'If-None-Match: {etag}'])),
+                    ]
+                for name, make_request in cases:
+                    rate = run(port, listeners, seconds, make_request)
+                    print(f'{name:14} {rate:12.1f} {1000 / rate:22.1f}')
+            finally:
+                proc.terminate()
+                proc.wait()
+    finally:
+        os.remove(AUDIO_PATH)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+# 收藏 / 追蹤切換的併發測試：很多 thread 同時對同一個按鈕送 PUT / DELETE / 舊的 toggle，
+# 最後檢查關聯表沒有重複列、統計表的計數和關聯表一致、沒有任何請求失敗 (以前連點會撞主鍵)。
+# 接著比較「立即寫入」和 FAVORITE_WRITE_BEHIND 在連點時送到資料庫的 SQL 數量。
+# 用法：python benchmarks/bench_toggles.py [thread 數] [每個 thread 的請求數]
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+TMP = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(TMP, "bench_toggles.db")}'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as music  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from app import (app, db, User, Artist, Album, Song, AlbumStats, ArtistStats, user_liked_albums,  # noqa: E402
+                 user_followed_artists, rebuild_stats)
+
+USERS = 20
+
+
+def fill():
+    with app.app_context():
+        db.create_all()
+        for user_id in range(1, USERS + 1):
+            db.session.add(User(user_id=user_id, email=f'u{user_id}@example.com', password_hash='x'))
+        db.session.add(Artist(artist_id=1, name='bench'))
+        db.session.add(Album(album_id=1, title='bench', artist_id=1))
+        db.session.add(Song(song_id=1, title='bench', album_id=1))
+        db.session.commit()
+        rebuild_stats()
+
+
+def client(user_id):
+    c = app.test_client()
+    with c.session_transaction() as sess:
+        sess['_user_id'] = str(user_id)
+    return c
+
+
+def check(label):
+    with app.app_context():
+        likes = db.session.query(db.func.count()).select_from(user_liked_albums).scalar()
+        follows = db.session.query(db.func.count()).select_from(user_followed_artists).scalar()
+        like_count = db.session.get(AlbumStats, 1).like_count
+        follower_count = db.session.get(ArtistStats, 1).follower_count
+    ok = likes == like_count and follows == follower_count
+    print(f'  {label}: 收藏列 {likes} / like_count {like_count}，追蹤列 {follows} / follower_count {follower_count}'
+          f'  {"一致" if ok else "不一致！"}')
+    return ok
+
+
+def hammer(threads, requests):
+    # 所有 thread 用同一個使用者 (模擬同一個人狂點) 再加上幾個不同的使用者
+    errors = []
+    statuses = {}
+    lock = threading.Lock()
+
+    def worker(n):
+        c = client(1 if n % 2 == 0 else 2 + n % (USERS - 1))
+        for _ in range(requests):
+            action = random.choice(['put', 'delete', 'toggle'])
+            try:
+                if action == 'toggle':
+                    response = c.post(random.choice(['/toggle_album_like/1', '/toggle_follow/1']))
+                else:
+                    response = getattr(c, action)(random.choice(['/album_like/1', '/follow/1']))
+                status = response.status_code
+            except Exception as e:  # noqa: BLE001
+                with lock:
+                    errors.append(repr(e))
+                continue
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+
+    start = time.perf_counter()
+    ts = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    elapsed = time.perf_counter() - start
+    total = threads * requests
+    print(f'  {total} 個請求，{elapsed:.2f} 秒 ({total / elapsed:.0f} req/s)，狀態碼 {statuses}，例外 {len(errors)}')
+    for e in errors[:3]:
+        print('   ', e)
+    return not errors and set(statuses) == {200}
+
+
+def burst_statements(clicks):
+    # 每個使用者對同一個演出者連點 clicks 次 (最後停在「追蹤」)。
+    # 請求不能包在外層的 app context 裡 (g 會共用，每個請求都變成同一個使用者)，所以直接掛在 engine 上計數
+    statements = []
+    with app.app_context():
+        engine = db.engine
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)  # noqa: E731
+    event.listen(engine, 'before_cursor_execute', listener)
+    try:
+        for user_id in range(1, USERS + 1):
+            c = client(user_id)
+            for i in range(clicks):
+                (c.put if i % 2 == 0 else c.delete)('/follow/1')
+        if music.favorite_buffer:
+            music.favorite_buffer.flush()
+    finally:
+        event.remove(engine, 'before_cursor_execute', listener)
+    writes = [s for s in statements if s.lstrip().upper().startswith(('INSERT', 'DELETE', 'UPDATE'))]
+    return len(statements), len(writes)
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    fill()
+    ok = True
+
+    print(f'同時 {threads} 個 thread，每個送 {requests} 次 PUT / DELETE / 舊 toggle')
+    print('立即寫入')
+    ok &= hammer(threads, requests)
+    ok &= check('結果')
+
+    music.favorite_buffer = music.WriteBehindBuffer(0.05)
+    print('write-behind (每 50ms 整批寫入)')
+    ok &= hammer(threads, requests)
+    music.favorite_buffer.flush()
+    ok &= check('結果')
+    print(f'  緩衝區：{music.favorite_buffer.counts}')
+
+    clicks = 9
+    print(f'\n{USERS} 個使用者各連點 {clicks} 次追蹤按鈕，送到資料庫的 SQL (全部 / 寫入)')
+    music.favorite_buffer = None
+    total, writes = burst_statements(clicks)
+    print(f'  立即寫入      {total:5} / {writes}')
+    music.favorite_buffer = music.WriteBehindBuffer(3600)  # 不讓背景 thread 插手，最後手動 flush 一次
+    total, writes = burst_statements(clicks)
+    print(f'  write-behind  {total:5} / {writes}')
+    ok &= check('結果')
+
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
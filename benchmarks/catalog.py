@@ -0,0 +1,211 @@
+# 產生假的曲庫給壓力測試用：演出者、專輯、歌曲 (含客串)、會員、播放清單，以及按讚、收藏專輯、追蹤、播放次數。
+# 同一個種子產生的資料完全一樣 (id 都是指定的)，換版本前後可以拿同一份資料比較。
+# 熱門程度是 Zipf 分布：少數歌曲 / 演出者拿走大部分的讚和播放，每個人按讚的數量是對數常態 (大部分幾十首，少數幾千首)。
+# 所有會員的密碼都是 bench，email 是 u<id>@bench.test。
+# 用法：BENCH_DATABASE_URL=sqlite:////tmp/catalog.db python benchmarks/catalog.py [歌曲數量] [種子]   (預設 10k 42)
+#       歌曲數量可以寫 1k、100k、1m；不設 BENCH_DATABASE_URL 就放在暫存的 SQLite
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault('DATABASE_URL', os.environ.get('BENCH_DATABASE_URL')
+                      or f'sqlite:///{os.path.join(tempfile.mkdtemp(), "catalog.db")}')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect  # noqa: E402
+from werkzeug.security import generate_password_hash  # noqa: E402
+from app import (app, db, User, Artist, Album, Song, Playlist, SongPopularity, ArtistPopularity,  # noqa: E402
+                 song_artists, playlist_songs, user_liked_songs, user_liked_albums, user_followed_artists,
+                 rebuild_stats)
+
+PASSWORD = 'bench'
+CHUNK = 20000
+# 歌名、專輯名從這裡組合，搜尋測試也從這裡挑字 (中英文都有，n-gram 索引兩種都要測到)
+WORDS = ['love', 'night', 'summer', 'rain', 'dream', 'heart', 'light', 'star', 'river', 'fire', 'moon', 'city',
+         'blue', 'gold', 'wild', 'home', 'road', 'sky', 'ocean', 'echo', 'winter', 'paper', 'glass', 'neon',
+         '晴天', '夜曲', '月亮', '星空', '回憶', '思念', '青春', '夏天', '大海', '下雨', '微風', '光年',
+         '城市', '告白', '遠方', '時間', '花火', '約定', '旅行', '孤單']
+FIRST = ['Blue', 'Silver', 'Golden', 'Little', 'Midnight', 'Electric', 'Velvet', 'Crystal', '陳', '林', '周', '張', '王']
+LAST = ['Band', 'Sisters', 'Club', 'Orchestra', 'Kids', 'Project', 'Trio', '綺貞', '宥嘉', '子瑜', '小明', '雅婷']
+BASE_TIME = datetime(2024, 1, 1)
+
+
+def parse_size(text):
+    text = str(text).lower()
+    scale = {'k': 1000, 'm': 1000000}.get(text[-1:], 1)
+    return int(float(text.rstrip('km')) * scale)
+
+
+def scales(n_songs):
+    # 其他表的大小跟著歌曲數量走
+    return dict(songs=n_songs, albums=max(1, math.ceil(n_songs / 10)), artists=max(10, n_songs // 25),
+                users=max(100, n_songs // 10))
+
+
+class ZipfPicker:
+    # id 1..n 依亂數排名，排名第 r 的權重 1 / r^s；同一個種子排名固定
+    def __init__(self, n, s, rng):
+        order = list(range(1, n + 1))
+        rng.shuffle(order)
+        weights = [0.0] * n
+        for rank, item_id in enumerate(order):
+            weights[item_id - 1] = 1 / (rank + 1) ** s
+        self.ids = range(1, n + 1)
+        self.cum_weights = []
+        total = 0.0
+        for w in weights:
+            total += w
+            self.cum_weights.append(total)
+        self.weights = weights
+
+    def pick(self, rng, k=1):
+        return rng.choices(self.ids, cum_weights=self.cum_weights, k=k)
+
+    def pick_unique(self, rng, k):
+        # 不重複的 k 個 (熱門的一定比較常被選到)；k 接近 n 時改成直接洗牌
+        k = min(k, len(self.ids))
+        if k > len(self.ids) // 2:
+            return rng.sample(self.ids, k)
+        chosen = set()
+        while len(chosen) < k:
+            chosen.update(self.pick(rng, (k - len(chosen)) * 2))
+        return list(chosen)[:k]
+
+
+def lognormal_count(rng, median, sigma, cap):
+    return min(cap, max(0, int(rng.lognormvariate(math.log(median), sigma))))
+
+
+def title(rng, words=(1, 3)):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(*words)))
+
+
+def insert_rows(table, rows):
+    # 分批 executemany，一百萬列也不會一次塞進記憶體
+    batch = []
+    count = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= CHUNK:
+            db.session.execute(table.insert(), batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        db.session.execute(table.insert(), batch)
+        count += len(batch)
+    db.session.commit()
+    return count
+
+
+def generate(n_songs, seed=42, log=print):
+    # 在目前的資料庫裡建表並填資料 (資料庫要是空的)；回傳各表的列數
+    rng = random.Random(seed)
+    size = scales(n_songs)
+    counts = {}
+    start = time.perf_counter()
+    db.create_all()
+
+    password_hash = generate_password_hash(PASSWORD)  # 每個人一樣，只算一次
+    counts['users'] = insert_rows(User.__table__, (
+        dict(user_id=u, email=f'u{u}@bench.test', password_hash=password_hash, display_name=f'聽眾 {u}',
+             subscription_type='Premium' if rng.random() < 0.3 else 'Free', created_at=BASE_TIME)
+        for u in range(1, size['users'] + 1)))
+    counts['artists'] = insert_rows(Artist.__table__, (
+        dict(artist_id=a, name=f'{rng.choice(FIRST)} {rng.choice(LAST)} {a}', bio=title(rng, (5, 12)))
+        for a in range(1, size['artists'] + 1)))
+
+    # 熱門的演出者專輯也比較多
+    artists = ZipfPicker(size['artists'], 0.6, rng)
+    album_artist = [0] + artists.pick(rng, size['albums'])
+    counts['albums'] = insert_rows(Album.__table__, (
+        dict(album_id=a, title=title(rng), artist_id=album_artist[a],
+             release_date=(BASE_TIME - timedelta(days=rng.randint(0, 365 * 30))).date(),
+             cover_art_url=f'/static/covers/{a % 200}.jpg')
+        for a in range(1, size['albums'] + 1)))
+
+    def album_of(song_id):
+        return (song_id - 1) // 10 + 1
+
+    counts['songs'] = insert_rows(Song.__table__, (
+        dict(song_id=s, title=title(rng), album_id=album_of(s), audio_file_url=f'/media/bench/{s}.mp3',
+             duration_minutes=rng.randint(2, 5), duration_seconds=rng.randint(0, 59),
+             upload_date=BASE_TIME + timedelta(minutes=s))
+        for s in range(1, n_songs + 1)))
+
+    def credits():
+        # 主唱 = 專輯的演出者，兩成的歌有一位客串
+        for s in range(1, n_songs + 1):
+            main = album_artist[album_of(s)]
+            yield dict(song_id=s, artist_id=main, role='main')
+            if rng.random() < 0.2:
+                guest = artists.pick(rng)[0]
+                if guest != main:
+                    yield dict(song_id=s, artist_id=guest, role='featured')
+    counts['song_artists'] = insert_rows(song_artists, credits())
+    log(f'  曲庫：{counts["artists"]} 位演出者，{counts["albums"]} 張專輯，{n_songs} 首歌 '
+        f'({time.perf_counter() - start:.1f}s)')
+
+    songs = ZipfPicker(n_songs, 1.0, rng)
+    albums = ZipfPicker(size['albums'], 0.9, rng)
+
+    def favorites(table, column, picker, median, cap):
+        stamp = list(table.c)[-1].name  # liked_at / followed_at
+        for u in range(1, size['users'] + 1):
+            for item_id in picker.pick_unique(rng, lognormal_count(rng, median, 1.0, cap)):
+                yield {'user_id': u, column: item_id, stamp: BASE_TIME + timedelta(seconds=rng.randint(0, 30000000))}
+    counts['user_liked_songs'] = insert_rows(user_liked_songs, favorites(user_liked_songs, 'song_id', songs, 20, 2000))
+    counts['user_liked_albums'] = insert_rows(user_liked_albums, favorites(user_liked_albums, 'album_id', albums, 3, 200))
+    counts['user_followed_artists'] = insert_rows(user_followed_artists,
+                                                  favorites(user_followed_artists, 'artist_id', artists, 5, 300))
+
+    # 一半的人有 1~3 個清單，四成公開
+    playlists = []
+    for u in range(1, size['users'] + 1):
+        for _ in range(rng.choice([0, 0, 0, 1, 1, 2, 3])):
+            playlists.append((len(playlists) + 1, u))
+    counts['playlists'] = insert_rows(Playlist.__table__, (
+        dict(playlist_id=p, name=title(rng, (1, 2)), user_id=u, is_public=rng.random() < 0.4, created_at=BASE_TIME)
+        for p, u in playlists))
+
+    def items():
+        for p, _ in playlists:
+            for i, song_id in enumerate(songs.pick_unique(rng, max(1, lognormal_count(rng, 25, 0.8, 500)))):
+                yield dict(playlist_id=p, song_id=song_id, track_order=(i + 1) * 1024, added_at=BASE_TIME)
+    counts['playlist_songs'] = insert_rows(playlist_songs, items())
+
+    # 播放次數跟熱門程度成正比 (演出者頁的熱門歌曲、加權抽樣會用到)
+    total_plays = n_songs * 50
+    scale = total_plays / songs.cum_weights[-1]
+    plays = [int(w * scale) for w in songs.weights]
+    per_artist = {}
+    for s in range(1, n_songs + 1):
+        per_artist[album_artist[album_of(s)]] = per_artist.get(album_artist[album_of(s)], 0) + plays[s - 1]
+    counts['song_popularity'] = insert_rows(SongPopularity.__table__, (
+        dict(song_id=s, artist_id=album_artist[album_of(s)], play_count=plays[s - 1], finish_count=plays[s - 1] * 2 // 3)
+        for s in range(1, n_songs + 1)))
+    insert_rows(ArtistPopularity.__table__, (dict(artist_id=a, play_count=n, finish_count=n * 2 // 3)
+                                             for a, n in per_artist.items()))
+
+    counts.update(rebuild_stats())
+    log(f'  會員 {counts["users"]} 人：按讚 {counts["user_liked_songs"]}，收藏專輯 {counts["user_liked_albums"]}，'
+        f'追蹤 {counts["user_followed_artists"]}，清單 {counts["playlists"]} 個 ({counts["playlist_songs"]} 首) '
+        f'({time.perf_counter() - start:.1f}s)')
+    return counts
+
+
+def main():
+    n_songs = parse_size(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 42
+    with app.app_context():
+        if inspect(db.engine).has_table('songs') and db.session.query(Song.song_id).first():
+            raise SystemExit(f'{db.engine.url} 已經有資料了，請換一個空的資料庫。')
+        print(f'資料庫：{db.engine.url}')
+        generate(n_songs, seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,349 @@
+# 壓力測試：用 catalog.py 產生的曲庫跑幾種固定的使用者流程 (逛專輯 / 搜尋 / 看自己的收藏 / 聽歌)，
+# 每個 endpoint 記下 p50 / p95 / p99 延遲、吞吐量和每個 request 的 SQL 數 (從 /metrics 算差值)，結果存成 JSON，
+# 之後用 --compare 跟上一次的結果比較。流程和資料都由種子決定，同一個種子每次送出的請求一模一樣。
+# 兩種跑法：--driver client 用 Flask test client (同一個程序，量的是 app 本身)；
+#           --driver http 起一個本機的多執行緒 HTTP server 用真的連線打 (或用 --url 打已經在跑的 gunicorn，
+#           這時資料庫要先用同一個 BENCH_DATABASE_URL 跑過 catalog.py，SQL 數要 /metrics 看得到才會有)。
+# 用法：python benchmarks/loadtest.py [--songs 10k] [--seed 42] [--journeys 300] [--users 20] [--concurrency 1]
+#         [--driver client|http] [--url http://127.0.0.1:8000] [--metrics-token TOKEN] [--out 結果.json] [--compare 上次.json]
+#       BENCH_DATABASE_URL 指到已經有資料的資料庫時不會重新產生 (--songs 以資料庫裡的為準)
+#       (流程會按讚、寫播放紀錄、改佇列，要前後比較的話每次都用同一份剛產生的資料庫複本)
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError
+from urllib.parse import quote, urlencode
+from urllib.request import HTTPCookieProcessor, Request, build_opener
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import catalog  # noqa: E402  (會設定 DATABASE_URL 並載入 app)
+from catalog import inspect  # noqa: E402
+from catalog import app, db, Playlist, Song, Album, Artist, User  # noqa: E402
+
+HX = {'HX-Request': 'true'}
+# 每種流程被選到的比例
+JOURNEYS = {'browse': 0.4, 'search': 0.25, 'library': 0.2, 'listen': 0.15}
+LOAD_MORE = re.compile(r'class="load-more-row" hx-get="([^"]+)"')
+METRIC_LINE = re.compile(r'^db_queries_per_request_(sum|count)\{endpoint="([^"]+)"[^}]*\} ([0-9.e+-]+)$')
+
+
+class World:
+    # 產生請求需要知道的 id 範圍和每個人的播放清單 (從資料庫讀，也適用於之前產生好的資料庫)
+    def __init__(self, seed):
+        rng = random.Random(seed)
+        self.songs = db.session.query(db.func.max(Song.song_id)).scalar()
+        self.albums = db.session.query(db.func.max(Album.album_id)).scalar()
+        self.artists = db.session.query(db.func.max(Artist.artist_id)).scalar()
+        self.users = db.session.query(db.func.max(User.user_id)).scalar()
+        self.own_playlists = {}
+        self.public_playlists = []
+        for playlist_id, user_id, is_public in db.session.query(Playlist.playlist_id, Playlist.user_id, Playlist.is_public):
+            self.own_playlists.setdefault(user_id, []).append(playlist_id)
+            if is_public:
+                self.public_playlists.append(playlist_id)
+        # 瀏覽時熱門的專輯、演出者、歌曲比較常被點到 (和產生資料時的排名無關，但同樣是 Zipf)
+        self.song_picker = catalog.ZipfPicker(self.songs, 1.0, rng)
+        self.album_picker = catalog.ZipfPicker(self.albums, 0.9, rng)
+        self.artist_picker = catalog.ZipfPicker(self.artists, 0.8, rng)
+
+
+def plan(world, rng, user_id, kind):
+    # 一個流程 = 一串 (method, path, headers, json)；('MORE', n) = 跟著上一頁的「載入更多」最多 n 次 (endpoint 後面標 (more))
+    song = lambda: world.song_picker.pick(rng)[0]  # noqa: E731
+    album = lambda: world.album_picker.pick(rng)[0]  # noqa: E731
+    steps = []
+    if kind == 'browse':
+        steps += [('GET', '/', {}, None),
+                  ('GET', f'/album/{album()}', HX, None),
+                  ('GET', f'/artist/{world.artist_picker.pick(rng)[0]}', HX, None),
+                  ('PUT' if rng.random() < 0.7 else 'DELETE', f'/like/{song()}', HX, None),
+                  ('GET', f'/album/{album()}', HX, None)]
+        if world.public_playlists:
+            steps.append(('GET', f'/playlist/{rng.choice(world.public_playlists)}', HX, None))
+    elif kind == 'search':
+        word = rng.choice(catalog.WORDS)
+        # 邊打字邊出建議，最後按 Enter
+        for n in range(1, len(word) + 1):
+            steps.append(('GET', f'/search/suggest?q={quote(word[:n])}', HX, None))
+        steps += [('GET', f'/search?q={quote(word)}', HX, None), ('MORE', 1),
+                  ('GET', f'/album/{album()}', HX, None)]
+    elif kind == 'library':
+        steps += [('GET', '/library', HX, None),
+                  ('GET', '/collection/tracks', HX, None), ('MORE', 2),
+                  ('GET', f'/user/{user_id}', HX, None)]
+        if world.own_playlists.get(user_id):
+            steps += [('GET', f'/playlist/{rng.choice(world.own_playlists[user_id])}', HX, None), ('MORE', 1)]
+    else:
+        steps.append(('POST', '/queue', {}, {'source': f'album:{album()}'}))
+        steps += [('POST', '/queue/next', {}, None)] * 3
+        played = [song() for _ in range(3)]
+        steps.append(('POST', '/history', {}, {'events': [
+            dict(song_id=s, event=e, position=p) for s in played for e, p in (('start', 0), ('finish', 180))]}))
+        steps.append(('GET', '/queue', {}, None))
+    return steps
+
+
+def build_plan(world, seed, journeys, users):
+    # 事先排好所有流程：第 i 個流程由虛擬使用者 i % users 執行
+    rng = random.Random(seed)
+    people = rng.sample(range(1, world.users + 1), min(users, world.users))
+    kinds, weights = zip(*JOURNEYS.items())
+    return [(people[i % len(people)], kind, plan(world, rng, people[i % len(people)], kind))
+            for i, kind in enumerate(rng.choices(kinds, weights, k=journeys))]
+
+
+class ClientSession:
+    # Flask test client，直接在 session 裡登入 (不用算密碼雜湊)
+    def __init__(self, user_id):
+        self.client = app.test_client()
+        with self.client.session_transaction() as sess:
+            sess['_user_id'] = str(user_id)
+
+    def request(self, method, path, headers, body):
+        response = self.client.open(path, method=method, headers=headers, json=body)
+        return response.status_code, response.get_data()
+
+
+class HTTPSession:
+    # 真的 HTTP 連線 (urllib)，用 /login 表單登入一次，之後帶 cookie
+    def __init__(self, base_url, user_id):
+        self.base_url = base_url
+        self.opener = build_opener(HTTPCookieProcessor(CookieJar()))
+        data = urlencode({'email': f'u{user_id}@bench.test', 'password': catalog.PASSWORD}).encode()
+        self.opener.open(Request(f'{base_url}/login', data=data, method='POST')).read()
+
+    def request(self, method, path, headers, body):
+        data = None if body is None else json.dumps(body).encode()
+        headers = dict(headers, **({'Content-Type': 'application/json'} if body is not None else {}))
+        try:
+            with self.opener.open(Request(self.base_url + path, data=data, headers=headers, method=method)) as r:
+                return r.status, r.read()
+        except HTTPError as e:
+            return e.code, e.read()
+
+
+def endpoint_of(adapter, method, path):
+    try:
+        return adapter.match(path.split('?')[0], method)[0]
+    except Exception:
+        return path
+
+
+def run_journeys(journeys, sessions, concurrency):
+    # 同一個虛擬使用者的流程都在同一個 thread 裡依序跑；回傳 [(endpoint, 秒, status)]
+    adapter = app.url_map.bind('localhost')
+    samples = []
+    lock = threading.Lock()
+    lanes = [[] for _ in range(concurrency)]
+    for user_id, kind, steps in journeys:
+        lanes[user_id % concurrency].append((user_id, steps))
+
+    def worker(lane):
+        local = []
+        for user_id, steps in lane:
+            session = sessions[user_id]
+            body = b''
+            for step in steps:
+                if step[0] == 'MORE':
+                    requests = []
+                    for _ in range(step[1]):
+                        match = LOAD_MORE.search(body.decode('utf-8', 'replace'))
+                        if not match:
+                            break
+                        path = match.group(1).replace('&amp;', '&')
+                        start = time.perf_counter()
+                        status, body = session.request('GET', path, HX, None)
+                        requests.append((endpoint_of(adapter, 'GET', path) + ' (more)', time.perf_counter() - start, status))
+                    local += requests
+                    continue
+                method, path, headers, payload = step
+                start = time.perf_counter()
+                status, body = session.request(method, path, headers, payload)
+                local.append((endpoint_of(adapter, method, path), time.perf_counter() - start, status))
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(lane,)) for lane in lanes if lane]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return samples
+
+
+def query_counts(fetch):
+    # /metrics 裡每個 endpoint 的 (SQL 總數, request 數)；多個 worker 的加總
+    status, text = fetch()
+    if status != 200:
+        return None
+    totals = {}
+    for line in text.decode().splitlines():
+        match = METRIC_LINE.match(line)
+        if match:
+            field, endpoint, value = match.groups()
+            row = totals.setdefault(endpoint, [0.0, 0.0])
+            row[0 if field == 'sum' else 1] += float(value)
+    return totals
+
+
+def percentile(sorted_values, p):
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def summarize(samples, wall, before, after):
+    routes = {}
+    for endpoint, seconds, status in samples:
+        routes.setdefault(endpoint, []).append((seconds, status))
+    result = {}
+    for endpoint, rows in sorted(routes.items(), key=lambda item: -len(item[1])):
+        times = sorted(s * 1000 for s, _ in rows)
+        # /metrics 不分第一頁和「載入更多」，SQL 數只算在沒有 (more) 的那一列 (兩者的平均)
+        qpr = None
+        if before is not None and after is not None and endpoint in after:
+            queries = after[endpoint][0] - before.get(endpoint, [0, 0])[0]
+            count = after[endpoint][1] - before.get(endpoint, [0, 0])[1]
+            qpr = round(queries / count, 2) if count else None
+        result[endpoint] = dict(count=len(rows), errors=sum(status >= 400 for _, status in rows),
+                                p50_ms=round(percentile(times, 50), 3), p95_ms=round(percentile(times, 95), 3),
+                                p99_ms=round(percentile(times, 99), 3), mean_ms=round(sum(times) / len(times), 3),
+                                rps=round(len(rows) / wall, 1), queries_per_request=qpr)
+    times = sorted(s * 1000 for _, s, _ in samples)
+    total = dict(requests=len(samples), errors=sum(status >= 400 for _, _, status in samples), seconds=round(wall, 3),
+                 rps=round(len(samples) / wall, 1), p50_ms=round(percentile(times, 50), 3),
+                 p95_ms=round(percentile(times, 95), 3), p99_ms=round(percentile(times, 99), 3))
+    return total, result
+
+
+def print_report(total, routes):
+    print(f'\n  {"endpoint":38} {"次數":>6} {"p50":>8} {"p95":>8} {"p99":>8} {"req/s":>8} {"SQL/req":>8} {"錯誤":>4}')
+    for endpoint, r in routes.items():
+        qpr = '-' if r['queries_per_request'] is None else f'{r["queries_per_request"]:.1f}'
+        print(f'  {endpoint:38} {r["count"]:6} {r["p50_ms"]:8.2f} {r["p95_ms"]:8.2f} {r["p99_ms"]:8.2f} '
+              f'{r["rps"]:8.1f} {qpr:>8} {r["errors"]:4}')
+    print(f'\n  全部 {total["requests"]} 個 request，{total["seconds"]:.1f}s，{total["rps"]:.1f} req/s，'
+          f'p50 {total["p50_ms"]:.2f} / p95 {total["p95_ms"]:.2f} / p99 {total["p99_ms"]:.2f} ms，錯誤 {total["errors"]}')
+
+
+def print_comparison(old, new):
+    print(f'\n和 {old["meta"]["started_at"]} ({old["meta"].get("commit") or "?"}，{old["meta"]["songs"]} 首歌，'
+          f'{old["meta"]["driver"]}) 比較：')
+    print(f'  {"endpoint":38} {"p50":>22} {"p95":>22} {"SQL/req":>12}')
+
+    def delta(a, b):
+        return f'{a:7.2f}→{b:7.2f} ({(b - a) / a:+.0%})' if a else f'{b:7.2f}'
+    for endpoint, r in new['routes'].items():
+        o = old['routes'].get(endpoint)
+        if not o:
+            continue
+        qpr = f'{o["queries_per_request"]}→{r["queries_per_request"]}' if r['queries_per_request'] is not None else '-'
+        print(f'  {endpoint:38} {delta(o["p50_ms"], r["p50_ms"]):>22} {delta(o["p95_ms"], r["p95_ms"]):>22} {qpr:>12}')
+    print(f'  {"req/s":38} {delta(old["summary"]["rps"], new["summary"]["rps"]):>22}')
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='曲庫壓力測試')
+    parser.add_argument('--songs', default='10k', help='產生多少首歌 (1k ~ 1m)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--journeys', type=int, default=300, help='總共跑幾個流程')
+    parser.add_argument('--warmup', type=int, default=20, help='先跑幾個流程暖機 (不列入結果)')
+    parser.add_argument('--users', type=int, default=20, help='虛擬使用者人數')
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--driver', choices=['client', 'http'], default='client')
+    parser.add_argument('--url', help='--driver http 時打這個網址，不自己起 server')
+    parser.add_argument('--metrics-token', help='/metrics 有設定 METRICS_TOKEN 時需要')
+    parser.add_argument('--out', help='結果 JSON (預設 benchmarks/results/<時間>-<歌曲數>-<driver>.json)')
+    parser.add_argument('--compare', help='上一次的結果 JSON')
+    args = parser.parse_args()
+
+    started_at = datetime.now().isoformat(timespec='seconds')
+    with app.app_context():
+        if not (inspect(db.engine).has_table('songs') and db.session.query(Song.song_id).first()):
+            print(f'產生曲庫 ({args.songs} 首，種子 {args.seed})')
+            catalog.generate(catalog.parse_size(args.songs), args.seed)
+        world = World(args.seed)
+        dialect = db.engine.dialect.name
+    print(f'資料庫：{dialect}，{world.songs} 首歌，{world.users} 位會員；{args.driver}，'
+          f'{args.users} 位虛擬使用者，{args.concurrency} 個並行')
+
+    server = None
+    if args.driver == 'client':
+        make_session = ClientSession
+        metrics_client = app.test_client()
+        headers = {'Authorization': f'Bearer {args.metrics_token}'} if args.metrics_token else {}
+        fetch_metrics = lambda: (lambda r: (r.status_code, r.data))(metrics_client.get('/metrics', headers=headers))  # noqa: E731
+    else:
+        base_url = args.url
+        if not base_url:
+            from werkzeug.serving import make_server
+            logging.getLogger('werkzeug').setLevel(logging.ERROR)
+            server = make_server('127.0.0.1', 0, app, threaded=True)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            base_url = f'http://127.0.0.1:{server.server_port}'
+        base_url = base_url.rstrip('/')
+        make_session = lambda user_id: HTTPSession(base_url, user_id)  # noqa: E731
+
+        def fetch_metrics():
+            headers = {'Authorization': f'Bearer {args.metrics_token}'} if args.metrics_token else {}
+            try:
+                with build_opener().open(Request(f'{base_url}/metrics', headers=headers)) as r:
+                    return r.status, r.read()
+            except (HTTPError, OSError) as e:
+                return getattr(e, 'code', 0), b''
+
+    journeys = build_plan(world, args.seed, args.warmup + args.journeys, args.users)
+    # 先全部登入好，登入 (密碼雜湊) 不算在量測時間裡
+    sessions = {user_id: make_session(user_id) for user_id, _, _ in journeys}
+    run_journeys(journeys[:args.warmup], sessions, args.concurrency)
+    before = query_counts(fetch_metrics)
+    start = time.perf_counter()
+    samples = run_journeys(journeys[args.warmup:], sessions, args.concurrency)
+    wall = time.perf_counter() - start
+    after = query_counts(fetch_metrics)
+    if server:
+        server.shutdown()
+    if before is None:
+        print('  (讀不到 /metrics，沒有 SQL 數；可能是 METRICS_ENABLED=0 或需要 --metrics-token)')
+
+    total, routes = summarize(samples, wall, before, after)
+    print_report(total, routes)
+    result = dict(meta=dict(started_at=started_at, commit=git_commit(), python=platform.python_version(),
+                            platform=platform.platform(), database=dialect, songs=world.songs, users=world.users,
+                            seed=args.seed, journeys=args.journeys, warmup=args.warmup, virtual_users=args.users,
+                            concurrency=args.concurrency, driver=args.driver, url=args.url),
+                  summary=total, routes=routes)
+    out = args.out or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results',
+                                   f'{started_at.replace(":", "")}-{world.songs}-{args.driver}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f'\n結果存到 {out}')
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            print_comparison(json.load(f), result)
+    if total['errors']:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
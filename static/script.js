@@ -31,9 +31,93 @@ function getPlayerElements() {
     };
 }
 
-let currentQueue = [];
-let currentSongIndex = -1;
+// 播放佇列在伺服器 (換頁、重新整理都還在)，這裡只留最後一次回傳的狀態：目前這首 + 接下來幾首
+let queueState = null;
 let repeatState = 0; 
+let currentSongId = null;
+
+// ★★★ 挑選音質 ★★★
+// 後端會依會員等級 (Free / Premium) 限制最高位元率，這裡再依量到的頻寬往下壓，避免行動網路卡頓。
+function estimateBandwidthKbps() {
+    // 有 Network Information API 就用它 (單位 Mbps)
+    const conn = navigator.connection;
+    if (conn && conn.downlink) return conn.downlink * 1000;
+    // 否則用最近一次音檔下載的實測值：bytes * 8 / ms = kbps
+    const entries = performance.getEntriesByType('resource')
+        .filter(e => e.name.includes('/stream/') && e.transferSize > 0 && e.duration > 0);
+    if (entries.length) {
+        const last = entries[entries.length - 1];
+        return last.transferSize * 8 / last.duration;
+    }
+    return 0;
+}
+
+const supportsNativeHls = !!document.createElement('audio').canPlayType('application/vnd.apple.mpegurl');
+
+function pickSource(url) {
+    const match = url && url.match(/^\/stream\/(\d+)$/);
+    if (!match) return url;
+    // Safari / iOS：交給原生 HLS 自己依網路狀況切換位元率
+    if (supportsNativeHls) return `/hls/${match[1]}.m3u8`;
+    const bandwidth = estimateBandwidthKbps();
+    // 只用一半頻寬，留餘裕給其他請求
+    return bandwidth ? `${url}?max_kbps=${Math.floor(bandwidth / 2)}` : url;
+}
+
+function setAudioSource(audio, url) {
+    audio.src = pickSource(url);
+    // HLS 沒有轉檔結果 (404) 時退回一般串流
+    audio.onerror = function() {
+        if (audio.src.includes('/hls/')) {
+            audio.onerror = null;
+            audio.src = url;
+            audio.play().catch(err => console.log(err));
+        }
+    };
+}
+
+// ★★★ 收聽紀錄：開始 / 暫停 / 拖曳 / 播完 (附帶播到第幾秒) 先存起來，整批送到後端 ★★★
+// 熱門排行、最近播放、續播位置都從這裡來；每 15 秒或累積 20 筆送一次，離開頁面時用 sendBeacon 送出剩下的
+const HISTORY_FLUSH_MS = 15000;
+const HISTORY_MAX_EVENTS = 20;
+let historyEvents = [];
+let historyTimer = null;
+
+function reportPlay(event) {
+    if (!currentSongId) return;
+    const audio = getPlayerElements().audio;
+    historyEvents.push({
+        song_id: Number(currentSongId), event: event,
+        position: audio ? Math.floor(audio.currentTime || 0) : null
+    });
+    if (historyEvents.length >= HISTORY_MAX_EVENTS) flushHistory();
+    else if (!historyTimer) historyTimer = setTimeout(flushHistory, HISTORY_FLUSH_MS);
+}
+
+function flushHistory(beacon = false) {
+    clearTimeout(historyTimer);
+    historyTimer = null;
+    if (!historyEvents.length) return;
+    const body = JSON.stringify({ events: historyEvents });
+    historyEvents = [];
+    if (beacon && navigator.sendBeacon && navigator.sendBeacon('/history', new Blob([body], { type: 'application/json' }))) return;
+    fetch('/history', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: body,
+        keepalive: true
+    }).catch(err => console.log(err));
+}
+
+// 關分頁 / 切到背景 (手機上可能就此被砍掉)：記下播到哪裡，把還沒送的送出去
+window.addEventListener('pagehide', function() {
+    const audio = getPlayerElements().audio;
+    if (audio && !audio.paused) reportPlay('pause');
+    flushHistory(true);
+});
+document.addEventListener('visibilitychange', function() {
+    if (document.visibilityState === 'hidden') flushHistory(true);
+});
 
 // ★★★ 視覺優化函式 ★★★
 function updateRangeVisuals(el) {
@@ -58,7 +142,8 @@ function addRangeListener(el, callback) {
 // --- 3. 播放邏輯 ---
 function playMusic(url, title, artist, coverUrl, rowElement, artistId) {
     const p = getPlayerElements();
-    p.audio.src = url;
+    setAudioSource(p.audio, url);
+    currentSongId = rowElement ? rowElement.dataset.songId : null;
     p.title.innerText = title;
     p.artist.innerText = artist;
 
@@ -85,7 +170,7 @@ function playMusic(url, title, artist, coverUrl, rowElement, artistId) {
     }
 
     if (rowElement) {
-        buildQueueFromDOM(rowElement);
+        enqueueFromRow(rowElement);
         document.querySelectorAll('.song-name-highlight').forEach(el => el.style.color = '');
         const titleEl = rowElement.querySelector('.song-name-highlight');
         if (titleEl) titleEl.style.color = '#1ed760';
@@ -93,20 +178,24 @@ function playMusic(url, title, artist, coverUrl, rowElement, artistId) {
 
     const playPromise = p.audio.play();
     if (playPromise !== undefined) {
-        playPromise.then(() => updatePlayIcon(true)).catch(err => console.log(err));
+        playPromise.then(() => {
+            updatePlayIcon(true);
+            reportPlay('start');
+        }).catch(err => console.log(err));
     }
     syncVisuals(title);
+    updateMediaSession({ title: title, artist: artist, artwork: coverUrl && coverUrl !== 'None' ? [{ src: coverUrl }] : [] });
 }
 
-function loadAndPlay(song) {
+// 伺服器回傳的一首歌 (queue_entries)：url、title、artist、artist_id、cover、song_id
+function showSong(song) {
     const p = getPlayerElements();
-    if (!p.audio) return;
-    p.audio.src = song.url;
+    currentSongId = song.song_id;
     if (p.title) p.title.innerText = song.title;
     if (p.artist) p.artist.innerText = song.artist;
 
     if (p.cover) {
-        if (song.cover && song.cover !== 'None') {
+        if (song.cover) {
             p.cover.src = song.cover;
             p.cover.style.display = 'block';
         } else {
@@ -114,112 +203,147 @@ function loadAndPlay(song) {
         }
     }
     
-    if (p.artist && song.artistId) {
+    if (p.artist && song.artist_id) {
         const newLink = p.artist.cloneNode(true);
         p.artist.parentNode.replaceChild(newLink, p.artist);
         newLink.href = "#";
         newLink.style.cursor = "pointer";
         newLink.onclick = function(e) {
             e.preventDefault();
-            htmx.ajax('GET', `/artist/${song.artistId}`, {
+            htmx.ajax('GET', `/artist/${song.artist_id}`, {
                 target: '#main-content', select: '#main-content', swap: 'outerHTML'
-            }).then(() => history.pushState(null, '', `/artist/${song.artistId}`));
+            }).then(() => history.pushState(null, '', `/artist/${song.artist_id}`));
         };
     }
+}
+
+function loadAndPlay(song) {
+    const p = getPlayerElements();
+    if (!p.audio) return;
+    setAudioSource(p.audio, song.url);
+    showSong(song);
 
     const playPromise = p.audio.play();
     if (playPromise !== undefined) {
-        playPromise.then(() => updatePlayIcon(true)).catch(err => console.log(err));
+        playPromise.then(() => {
+            updatePlayIcon(true);
+            reportPlay('start');
+        }).catch(err => console.log(err));
     }
     syncVisuals(song.title);
+    updateMediaSession(song);
+    warmupNext();
 }
 
-function buildQueueFromDOM(clickedRow) {
-    currentQueue = [];
-    const rows = document.querySelectorAll('.song-row');
-    rows.forEach((row, index) => {
-        const onclickText = row.getAttribute('onclick');
-        if (!onclickText) return;
-        const parts = onclickText.split("'");
-        if (parts.length >= 10) {
-            currentQueue.push({
-                url: parts[1], title: parts[3], artist: parts[5], cover: parts[7], artistId: parts[9]
-            });
-        }
-        if (row === clickedRow) currentSongIndex = index;
-    });
+// --- 4. 播放佇列 (伺服器端) ---
+function queueRequest(method, url, body) {
+    return fetch(url, {
+        method: method,
+        headers: { 'Content-Type': 'application/json' },
+        body: body ? JSON.stringify(body) : undefined
+    }).then(res => res.ok ? res.json() : Promise.reject(res.status))
+      .then(state => {
+          queueState = state;
+          repeatState = state.repeat;
+          updateModeButtons();
+          return state;
+      });
 }
 
-// --- 4. 播放控制 ---
-function playNextSong(autoPlay = false) {
-    if (currentQueue.length === 0) return;
-    const p = getPlayerElements();
-    if ((autoPlay || !autoPlay) && repeatState === 2) {
-        p.audio.currentTime = 0;
-        p.audio.play();
-        return;
-    }
-    let nextIndex = currentSongIndex + 1;
-    if (nextIndex >= currentQueue.length) {
-        if (repeatState === 1) {
-            nextIndex = 0;
-        } else {
-            updatePlayIcon(false);
-            return;
-        }
+// 點了某一列：整個來源 (專輯、播放清單、演出者、已按讚) 一次排進佇列，從這首開始；
+// 沒有來源的列表 (搜尋結果) 就送頁面上的歌
+function enqueueFromRow(row) {
+    const body = { mode: 'play', start: Number(row.dataset.songId) };
+    const container = row.closest('[data-queue]');
+    if (container) {
+        body.source = container.dataset.queue;
+    } else {
+        body.songs = Array.from(document.querySelectorAll('.song-row'))
+            .map(r => Number(r.dataset.songId)).filter(Boolean);
     }
-    currentSongIndex = nextIndex;
-    loadAndPlay(currentQueue[nextIndex]);
-}// --- 7. 下一首邏輯 (修正版) ---
-function playNextSong(autoPlay = false) {
-    if (currentQueue.length === 0) return;
+    queueRequest('POST', '/queue', body).then(state => {
+        if (state.current) updateMediaSession(state.current);
+        warmupNext();
+    }).catch(err => console.log(err));
+}
+
+// 下一首播 / 加到佇列最後
+function enqueueSong(songId, mode) {
+    queueRequest('POST', '/queue', { songs: [Number(songId)], mode: mode }).catch(err => console.log(err));
+}
 
+// 演出者電台：伺服器每次補一批相似的歌，播不完
+function startRadio(artistId) {
+    queueRequest('POST', `/queue/radio/${artistId}`)
+        .then(state => { if (state.current) loadAndPlay(state.current); })
+        .catch(err => console.log(err));
+}
+
+// 重新整理 / 開新分頁：把上次播到的那首放回播放列 (瀏覽器不允許自動播放，按播放鍵才開始)
+function restoreQueue() {
+    const p = getPlayerElements();
+    if (!p.audio || p.audio.src) return;
+    queueRequest('GET', '/queue').then(state => {
+        if (!state.current) return;
+        setAudioSource(p.audio, state.current.url);
+        showSong(state.current);
+        syncVisuals(state.current.title);
+        updateMediaSession(state.current);
+        // 上次聽到一半：從那裡接著播
+        return fetch(`/api/song/${state.current.song_id}`).then(r => r.ok ? r.json() : null).then(meta => {
+            if (!meta || !meta.resume || currentSongId !== state.current.song_id) return;
+            p.audio.currentTime = meta.resume;
+            if (p.currTime) p.currTime.innerText = formatTime(meta.resume);
+        });
+    }).catch(err => console.log(err));
+}
+
+// --- 5. 播放控制 ---
+function playNextSong(autoPlay = false) {
     const p = getPlayerElements();
 
     // 1. 單曲循環
-    if ((autoPlay || !autoPlay) && repeatState === 2) {
+    if (repeatState === 2) {
         p.audio.currentTime = 0;
         p.audio.play();
+        reportPlay('start');
         return;
     }
 
-    // 計算下一首的位置
-    let nextIndex = currentSongIndex + 1;
+    // 2. 自然播完而且下一首已經在備用播放器裡緩衝好：直接接上，再通知伺服器往下走
+    if (autoPlay && prefetched && nextQueued() && prefetched.song.song_id === nextQueued().song_id) {
+        const song = swapToStandby();
+        queueRequest('POST', '/queue/next').then(state => {
+            // 佇列在別的分頁被改過：以伺服器為準
+            if (state.current && state.current.song_id !== song.song_id) loadAndPlay(state.current);
+            else warmupNext();
+        }).catch(err => console.log(err));
+        return;
+    }
 
-    // 2. 判斷是否到底了
-    if (nextIndex >= currentQueue.length) {
-        if (repeatState === 1) {
-            // 列表循環：回到第一首
-            nextIndex = 0; 
-        } else {
-            // ★★★ 修正這裡：不循環模式 ★★★
-            // 1. 真正的停止音樂
+    // 3. 下一首由伺服器決定 (隨機、列表循環、電台補歌都在那邊)
+    queueRequest('POST', '/queue/next').then(state => {
+        if (!state.current) {
+            // 不循環而且播完了：真正停止音樂，進度拉回開頭
             p.audio.pause(); 
-            // 2. (選用) 把進度拉回開頭
             p.audio.currentTime = 0; 
-            // 3. 更新圖示為「暫停狀態 (顯示播放鍵)」
             updatePlayIcon(false); 
             return;
         }
-    }
-
-    // 3. 正常播放下一首
-    currentSongIndex = nextIndex;
-    loadAndPlay(currentQueue[nextIndex]);
+        loadAndPlay(state.current);
+    }).catch(err => console.log(err));
 }
 
 function playPrevSong() {
-    if (currentQueue.length === 0) return;
     const p = getPlayerElements();
     if (repeatState === 2 || p.audio.currentTime > 3) {
         p.audio.currentTime = 0;
         p.audio.play();
         return;
     }
-    let prevIndex = currentSongIndex - 1;
-    if (prevIndex < 0) prevIndex = 0;
-    currentSongIndex = prevIndex;
-    loadAndPlay(currentQueue[prevIndex]);
+    queueRequest('POST', '/queue/prev').then(state => {
+        if (state.current) loadAndPlay(state.current);
+    }).catch(err => console.log(err));
 }
 
 function playFirstSong() {
@@ -251,20 +375,144 @@ function updatePlayIcon(isPlaying) {
 }
 
 function toggleRepeat() {
+    queueRequest('PUT', '/queue/mode', { repeat: (repeatState + 1) % 3 }).catch(err => console.log(err));
+}
+
+function toggleShuffle() {
+    queueRequest('PUT', '/queue/mode', { shuffle: !(queueState && queueState.shuffle) }).catch(err => console.log(err));
+}
+
+function updateModeButtons() {
     const btn = document.getElementById('repeat-btn');
-    if (!btn) return;
-    repeatState = (repeatState + 1) % 3;
-    btn.classList.remove('active');
-    btn.classList.remove('repeat-one');
-    if (repeatState === 1) {
-        btn.classList.add('active');
-        btn.title = "列表循環";
-    } else if (repeatState === 2) {
-        btn.classList.add('active');
-        btn.classList.add('repeat-one');
-        btn.title = "單曲循環";
-    } else {
-        btn.title = "不循環";
+    if (btn) {
+        btn.classList.remove('active');
+        btn.classList.remove('repeat-one');
+        if (repeatState === 1) {
+            btn.classList.add('active');
+            btn.title = "列表循環";
+        } else if (repeatState === 2) {
+            btn.classList.add('active');
+            btn.classList.add('repeat-one');
+            btn.title = "單曲循環";
+        } else {
+            btn.title = "不循環";
+        }
+    }
+    const shuffleBtn = document.getElementById('shuffle-btn');
+    if (shuffleBtn) shuffleBtn.classList.toggle('active', !!(queueState && queueState.shuffle));
+}
+
+// --- 6. 無縫播放 (預先載入下一首) & Media Session ---
+// 一開始播就先抓下一首的前幾秒 (Range 請求，暖好瀏覽器快取和伺服器的檔案快取)；
+// 剩 PREFETCH_LEAD_SECONDS 秒時讓備用的 <audio> 開始緩衝下一首，播完直接交換，不用等下載和解碼。
+const PREFETCH_LEAD_SECONDS = 20;
+let prefetched = null;   // 已經放進備用播放器的下一首 { song, src }
+let warmedUp = null;     // 已經暖機過的 song_id
+
+function nextQueued() {
+    return queueState && queueState.upcoming && queueState.upcoming[0];
+}
+
+function standbyAudio() {
+    let el = document.getElementById('audio-standby');
+    if (!el) {
+        const current = document.getElementById('audio-player');
+        if (!current) return null;
+        el = document.createElement('audio');
+        el.id = 'audio-standby';
+        el.preload = 'auto';
+        current.parentNode.appendChild(el);
+    }
+    return el;
+}
+
+function warmupNext() {
+    const next = nextQueued();
+    if (!next || warmedUp === next.song_id) return;
+    warmedUp = next.song_id;
+    const src = pickSource(next.url);
+    // HLS 交給瀏覽器自己處理
+    if (src.includes('/hls/')) return;
+    const kbps = src.match(/max_kbps=(\d+)/);
+    fetch(`/api/song/${next.song_id}` + (kbps ? `?max_kbps=${kbps[1]}` : ''))
+        .then(res => res.ok ? res.json() : Promise.reject(res.status))
+        .then(meta => {
+            if (!meta.warmup_bytes) return;
+            return fetch(src, { headers: { Range: `bytes=0-${meta.warmup_bytes - 1}` } }).then(res => res.arrayBuffer());
+        })
+        .catch(err => console.log(err));
+}
+
+function prefetchNext(audio) {
+    const next = nextQueued();
+    if (!next || repeatState === 2 || !audio.duration) return;
+    if (audio.duration - audio.currentTime > PREFETCH_LEAD_SECONDS) return;
+    if (prefetched && prefetched.song.song_id === next.song_id) return;
+    const standby = standbyAudio();
+    if (!standby) return;
+    const src = pickSource(next.url);
+    // 抓不到 (例如還沒有 HLS) 就放棄，播完時照一般流程載入
+    standby.onerror = () => { prefetched = null; };
+    standby.src = src;
+    standby.load();
+    prefetched = { song: next, src: src };
+}
+
+// 備用播放器變成主播放器 (互換 id，事件重新綁定)，回傳正在播的歌
+function swapToStandby() {
+    const old = document.getElementById('audio-player');
+    const standby = standbyAudio();
+    const song = prefetched.song;
+    prefetched = null;
+
+    standby.onerror = null;
+    standby.volume = old.volume;
+    standby.muted = old.muted;
+    old.onended = old.ontimeupdate = old.onplay = old.onpause = old.onseeked = old.onerror = null;
+    old.pause();
+    old.id = 'audio-standby';
+    standby.id = 'audio-player';
+    initPlayerEvents();
+
+    const playPromise = standby.play();
+    if (playPromise !== undefined) {
+        playPromise.then(() => updatePlayIcon(true)).catch(err => console.log(err));
+    }
+    showSong(song);
+    reportPlay('start');
+    syncVisuals(song.title);
+    updateMediaSession(song);
+    old.removeAttribute('src');
+    old.load();
+    return song;
+}
+
+function updateMediaSession(song) {
+    if (!('mediaSession' in navigator) || !song) return;
+    navigator.mediaSession.metadata = new MediaMetadata({
+        title: song.title, artist: song.artist, album: song.album || '', artwork: song.artwork || []
+    });
+}
+
+// 鎖定畫面、耳機、鍵盤的播放鍵
+function initMediaSession() {
+    if (!('mediaSession' in navigator)) return;
+    const audio = () => getPlayerElements().audio;
+    const handlers = {
+        play: () => { audio().play(); updatePlayIcon(true); },
+        pause: () => { audio().pause(); updatePlayIcon(false); },
+        previoustrack: () => playPrevSong(),
+        nexttrack: () => playNextSong(false),
+        seekto: (details) => { audio().currentTime = details.seekTime; },
+        seekbackward: (details) => { audio().currentTime = Math.max(audio().currentTime - (details.seekOffset || 10), 0); },
+        seekforward: (details) => { audio().currentTime = Math.min(audio().currentTime + (details.seekOffset || 10), audio().duration || 0); }
+    };
+    for (const [action, handler] of Object.entries(handlers)) {
+        try {
+            navigator.mediaSession.setActionHandler(action, handler);
+        } catch (err) {
+            // 舊瀏覽器不支援某些動作
+        }
     }
 }
 
@@ -277,12 +525,16 @@ function initPlayerEvents() {
     if (p.audio) {
         if (p.bar) {
             addRangeListener(p.bar, (val) => {
-                const seekTime = (val / 100) * p.audio.duration;
-                p.audio.currentTime = seekTime;
+                // 無縫播放會換掉 <audio>，每次都重新抓目前的
+                const audio = getPlayerElements().audio;
+                audio.currentTime = (val / 100) * audio.duration;
             });
         }
 
-        p.audio.onended = function() { playNextSong(true); };
+        p.audio.onended = function() {
+            reportPlay('finish');
+            playNextSong(true);
+        };
         
         p.audio.ontimeupdate = function() {
             if (p.audio.duration) {
@@ -291,12 +543,34 @@ function initPlayerEvents() {
                 p.currTime.innerText = formatTime(p.audio.currentTime);
                 p.totTime.innerText = formatTime(p.audio.duration);
                 updateRangeVisuals(p.bar);
+                prefetchNext(p.audio);
+                if ('mediaSession' in navigator && navigator.mediaSession.setPositionState) {
+                    navigator.mediaSession.setPositionState({
+                        duration: p.audio.duration, position: Math.min(p.audio.currentTime, p.audio.duration),
+                        playbackRate: p.audio.playbackRate
+                    });
+                }
             }
         };
+
+        p.audio.onpause = function() {
+            // 播完時也會先觸發 pause，接著的 finish 會把續播位置清掉
+            reportPlay('pause');
+            if ('mediaSession' in navigator) navigator.mediaSession.playbackState = 'paused';
+        };
+        p.audio.onseeked = () => reportPlay('seek');
+
+        if ('mediaSession' in navigator) {
+            p.audio.onplay = () => { navigator.mediaSession.playbackState = 'playing'; };
+        }
     }
 }
 
-document.addEventListener('DOMContentLoaded', initPlayerEvents);
+document.addEventListener('DOMContentLoaded', function() {
+    initPlayerEvents();
+    initMediaSession();
+    restoreQueue();
+});
 document.body.addEventListener('htmx:afterSwap', function() {
     initPlayerEvents();
     syncVisuals();
@@ -376,8 +650,8 @@ function formatTime(seconds) {
 
 function syncVisuals(playingTitle) {
     document.querySelectorAll('.song-name-highlight').forEach(el => el.style.color = '');
-    if (!playingTitle && currentQueue.length > 0 && currentSongIndex !== -1) {
-        playingTitle = currentQueue[currentSongIndex].title;
+    if (!playingTitle && queueState && queueState.current) {
+        playingTitle = queueState.current.title;
     }
     if (!playingTitle) return;
 
@@ -392,8 +666,17 @@ function syncVisuals(playingTitle) {
 
 // 彈跳視窗邏輯
 let currentSongIdToAdd = null; 
+let currentAlbumIdToAdd = null;
 function openAddToPlaylistModal(songId) {
     currentSongIdToAdd = songId;
+    currentAlbumIdToAdd = null;
+    const modal = document.getElementById("addToPlaylistModal");
+    if (modal) modal.style.display = "flex";
+}
+// 整張專輯加入播放清單 (共用同一個選清單的視窗)
+function openAddAlbumToPlaylistModal(albumId) {
+    currentAlbumIdToAdd = albumId;
+    currentSongIdToAdd = null;
     const modal = document.getElementById("addToPlaylistModal");
     if (modal) modal.style.display = "flex";
 }
@@ -401,8 +684,13 @@ function closeAddToPlaylistModal() {
     const modal = document.getElementById("addToPlaylistModal");
     if (modal) modal.style.display = "none";
     currentSongIdToAdd = null;
+    currentAlbumIdToAdd = null;
 }
 function addToPlaylist(playlistId, element) {
+    if (currentAlbumIdToAdd) {
+        addAlbumToPlaylist(playlistId);
+        return;
+    }
     if (!currentSongIdToAdd) {
         console.error("未選擇歌曲");
         return;
@@ -437,6 +725,55 @@ function addToPlaylist(playlistId, element) {
         alert("發生錯誤，請稍後再試。");
     });
 }
+function addAlbumToPlaylist(playlistId) {
+    fetch(`/add_album_to_playlist/${playlistId}/${currentAlbumIdToAdd}`, { method: 'POST' })
+    .then(response => response.json())
+    .then(data => {
+        if (data.added) {
+            closeAddToPlaylistModal();
+        } else {
+            alert("這張專輯的歌都已經在播放清單裡囉！");
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        alert("發生錯誤，請稍後再試。");
+    });
+}
+
+// 播放清單拖曳排序 (只有清單擁有者看到的列是 draggable)
+// 拖曳時直接在畫面上移動那一列，放開後告訴後端「排在哪首歌後面」，後端只需要改這一首的位置
+let draggingRow = null;
+document.addEventListener('dragstart', e => {
+    const row = e.target.closest && e.target.closest('tr.song-row[draggable="true"]');
+    if (!row) return;
+    draggingRow = row;
+    e.dataTransfer.effectAllowed = 'move';
+});
+document.addEventListener('dragover', e => {
+    if (!draggingRow) return;
+    const row = e.target.closest && e.target.closest('tr.song-row[draggable="true"]');
+    if (!row || row === draggingRow || row.parentNode !== draggingRow.parentNode) return;
+    e.preventDefault();
+    const rect = row.getBoundingClientRect();
+    row.parentNode.insertBefore(draggingRow, e.clientY < rect.top + rect.height / 2 ? row : row.nextSibling);
+});
+document.addEventListener('drop', e => {
+    if (draggingRow) e.preventDefault();
+});
+document.addEventListener('dragend', () => {
+    if (!draggingRow) return;
+    const row = draggingRow;
+    draggingRow = null;
+    let prev = row.previousElementSibling;
+    while (prev && !prev.matches('tr.song-row')) prev = prev.previousElementSibling;
+    fetch(`/playlist/${row.dataset.playlistId}/songs`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ move: [{ song_id: Number(row.dataset.songId), after: prev ? Number(prev.dataset.songId) : null }] })
+    }).catch(error => console.error('Error:', error));
+    row.parentNode.querySelectorAll('tr.song-row .index-num').forEach((el, i) => el.innerText = i + 1);
+});
 
 function openModal() {
     const modal = document.getElementById("createPlaylistModal");